@@ -0,0 +1,56 @@
+"""
+Benchmark: per-pair (fanout) vs batched report evaluation.
+
+Scores the same interview with both aggregate_report modes and prints
+Gemini requests, input/output tokens and wall time for each. The response
+cache and near-duplicate reuse are off, so every pair is really scored in
+each mode and the runs do not feed each other.
+Requires GEMINI_API_KEY in .env (or LLM_PROVIDER=fake).
+"""
+
+import os
+import asyncio
+import time
+
+os.environ["LLM_CACHE_ENABLED"] = "0"
+os.environ["NEAR_DUP_ENABLED"] = "0"
+
+from interview_agent import llm
+from interview_agent.prompts import QUESTION_TEMPLATES
+from interview_agent.advanced_scoring import aggregate_report
+
+ROLE = "software_engineer"
+ANSWERS = [
+    "A process has its own memory space, while threads share the memory of their process.",
+    "When two threads access shared data without synchronization and the result depends on timing.",
+    "It hashes the key to a bucket index and stores entries there, resolving collisions with chaining.",
+    "O(n log n), since the array is halved log n times and each level does linear merging work.",
+]
+
+
+async def run_mode(mode: str, qa_pairs):
+    llm.reset_usage()
+    start = time.perf_counter()
+    await aggregate_report(ROLE, qa_pairs, mode=mode)
+    elapsed = time.perf_counter() - start
+    return llm.usage_stats(), elapsed
+
+
+async def main(repeat: int = 3):
+    questions = QUESTION_TEMPLATES[ROLE] * repeat
+    qa_pairs = [
+        {"question": q, "answer": ANSWERS[i % len(ANSWERS)]}
+        for i, q in enumerate(questions)
+    ]
+    print(f"📊 {len(qa_pairs)} Q&A pairs\n")
+    print(f"{'mode':<8} {'requests':>8} {'in_tokens':>10} {'out_tokens':>10} {'wall_s':>8}")
+    for mode in ("fanout", "batch"):
+        usage, elapsed = await run_mode(mode, qa_pairs)
+        print(
+            f"{mode:<8} {usage['requests']:>8} {usage['input_tokens']:>10} "
+            f"{usage['output_tokens']:>10} {elapsed:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
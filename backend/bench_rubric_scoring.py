@@ -0,0 +1,59 @@
+"""
+Benchmark: local rubric scorer throughput.
+
+Scores synthetic answers against random bank questions, once as a single
+vectorized batch and once answer by answer (the per-turn path), and prints
+answers/sec for each. No LLM or API key needed.
+
+Run: python bench_rubric_scoring.py --answers 20000
+"""
+
+import time
+import random
+import argparse
+
+from interview_agent.scoring import ScoreEngine
+from interview_agent.question_bank import bank
+
+ANSWERS = [
+    "A process has its own memory and address space, while threads share the memory of their process. "
+    "Threads are lighter, so context switching between them is cheaper.",
+    "When two threads update a shared counter concurrently without a lock, the result depends on timing. "
+    "Use a mutex or an atomic increment.",
+    "It hashes the key into a bucket index and resolves collisions with chaining, so lookups are O(1) on average.",
+    "Merge sort splits the array in halves and merges each level in linear time, so it is O(n log n).",
+    "Honestly I was watching football yesterday, did you see the game last night? It was great.",
+    "I don't know",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--answers", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    ids = [qid for role in bank.roles() for qid in bank.ids(role)]
+    questions = [rng.choice(ids) for _ in range(args.answers)]
+    answers = [f"{rng.choice(ANSWERS)} ({i})" for i in range(args.answers)]
+    engine = ScoreEngine()
+    engine.score_batch(answers[:10], questions[:10])  # warm rubric cache
+
+    start = time.perf_counter()
+    scores = engine.score_batch(answers, questions)
+    batch_s = time.perf_counter() - start
+
+    single = min(args.answers, 5000)
+    start = time.perf_counter()
+    for answer, qid in zip(answers[:single], questions[:single]):
+        engine.simple_scoring(answer, qid)
+    single_s = time.perf_counter() - start
+
+    print(f"📊 {args.answers} answers, mean technical {scores['technical'].mean():.2f}")
+    print(f"batch      {args.answers / batch_s:>10.0f} answers/sec")
+    print(f"per-turn   {single / single_s:>10.0f} answers/sec")
+
+
+if __name__ == "__main__":
+    main()
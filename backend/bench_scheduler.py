@@ -0,0 +1,94 @@
+"""
+Benchmark: live-turn latency during a report burst, with and without
+priority scheduling.
+
+Runs offline against the fake provider under a requests-per-minute quota.
+A burst of report evaluations is fired at once while live classification
+calls arrive at a steady rate; prints live-call latency and how many
+report evaluations completed. In the "flat" run every call is scheduled
+as a report evaluation, which is what an uncoordinated client sees.
+
+Run: python bench_scheduler.py --rpm 600 --reports 300 --live 40
+"""
+
+import os
+import time
+import asyncio
+import argparse
+
+os.environ.setdefault("LLM_PROVIDER", "fake")
+os.environ.setdefault("LLM_CACHE_ENABLED", "0")
+os.environ.setdefault("FAKE_LLM_LATENCY", "fixed:0.2")
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[k]
+
+
+async def run(prioritized: bool, rpm: int, reports: int, live: int, interval: float):
+    from interview_agent import llm
+    from interview_agent import scheduler as sched
+
+    llm.scheduler = sched.LLMScheduler(rpm=rpm, tpm=0, max_in_flight=64, queue_limits=(1000,) * 4)
+    latencies, done = [], [0]
+
+    async def report_call(i: int):
+        try:
+            await llm.call_llm(f"Return EXACT JSON evaluation #{i}", stage="evaluate", use_cache=False)
+            done[0] += 1
+        except llm.LLMUnavailableError:
+            pass
+
+    async def live_call(i: int):
+        start = time.perf_counter()
+        try:
+            await llm.call_llm(f"Classify the user's message #{i}", stage="classify", use_cache=False)
+            latencies.append(time.perf_counter() - start)
+        except llm.LLMUnavailableError:
+            pass
+
+    async def live_stream():
+        tasks = []
+        for i in range(live):
+            tasks.append(asyncio.create_task(live_call(i)))
+            await asyncio.sleep(interval)
+        await asyncio.gather(*tasks)
+
+    async def burst():
+        await asyncio.gather(*(report_call(i) for i in range(reports)))
+
+    start = time.perf_counter()
+    if prioritized:
+        await asyncio.gather(burst(), live_stream())
+    else:
+        with sched.priority_class(sched.REPORT):
+            await asyncio.gather(burst(), live_stream())
+    elapsed = time.perf_counter() - start
+
+    label = "priority" if prioritized else "flat"
+    print(
+        f"{label:<9} live p50 {percentile(latencies, 50) * 1000:>7.0f} ms  "
+        f"p99 {percentile(latencies, 99) * 1000:>7.0f} ms  "
+        f"live shed {live - len(latencies):>3}  reports done {done[0]:>4}/{reports}  wall {elapsed:.1f}s"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rpm", type=int, default=600)
+    parser.add_argument("--reports", type=int, default=300)
+    parser.add_argument("--live", type=int, default=40)
+    parser.add_argument("--interval", type=float, default=0.25, help="seconds between live calls")
+    args = parser.parse_args()
+
+    print(f"⚖️  quota {args.rpm} rpm, burst of {args.reports} evaluations, {args.live} live turns\n")
+    for prioritized in (False, True):
+        await run(prioritized, args.rpm, args.reports, args.live, args.interval)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""
+Benchmark: memory used by 100k live sessions.
+
+Compares the original nested-dict session layout with the compact
+SessionRecord layout used by InMemorySessionStore. Each session asks every
+question of its role once and stores one answer per question.
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+
+from interview_agent.prompts import QUESTION_TEMPLATES
+from interview_agent.store import InMemorySessionStore
+
+N_SESSIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+ROLES = list(QUESTION_TEMPLATES)
+
+
+def legacy_sessions(n: int):
+    """The pre-SessionRecord layout: a dict of dicts and lists per session."""
+    sessions = {}
+    for i in range(n):
+        role = ROLES[i % len(ROLES)]
+        session = {
+            "role": role,
+            "questions_asked": [],
+            "answers": [],
+            "created_at": time.time(),
+            "turn_count": 0,
+            "confusion_count": 0,
+            "off_topic_count": 0,
+            "last_question": None,
+            "metadata": {}
+        }
+        for q in QUESTION_TEMPLATES[role]:
+            session["questions_asked"].append({"q": q, "metadata": {"difficulty": "medium", "topic": role}})
+            session["last_question"] = q
+            session["answers"].append(f"answer {i}")
+        sessions[f"s{i}"] = session
+    return sessions
+
+
+def compact_sessions(n: int):
+    store = InMemorySessionStore()
+    now = time.time()
+    for i in range(n):
+        role = ROLES[i % len(ROLES)]
+        sid = f"s{i}"
+        store.create(sid, role, now)
+        for q in QUESTION_TEMPLATES[role]:
+            store.append_question(sid, q, {"difficulty": "medium", "topic": role})
+            store.append_answer(sid, f"answer {i}")
+    return store
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = build(N_SESSIONS)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    return current, elapsed
+
+
+if __name__ == "__main__":
+    print(f"📊 {N_SESSIONS:,} sessions\n")
+    results = {}
+    for name, build in (("legacy dict", legacy_sessions), ("SessionRecord", compact_sessions)):
+        used, elapsed = measure(build)
+        results[name] = used
+        print(f"{name:<14} {used / 1e6:8.1f} MB  {used / N_SESSIONS:7.0f} B/session  build {elapsed:5.2f}s")
+    ratio = results["legacy dict"] / results["SessionRecord"]
+    print(f"\nSessionRecord uses {ratio:.1f}x less memory")
@@ -0,0 +1,49 @@
+"""
+Benchmark: application startup time.
+
+Imports the app (and the interview_agent modules) in fresh interpreters,
+reports the median wall time, and checks that the LangChain/Google stack is
+not pulled in until the first LLM call.
+
+Run: python bench_startup.py [runs]
+"""
+
+import sys
+import json
+import statistics
+import subprocess
+
+RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+HEAVY_MODULES = ("langchain_google_genai", "langchain_core", "google.generativeai", "grpc")
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module: str):
+    times, heavy = [], []
+    for _ in range(RUNS):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        times.append(result["seconds"])
+        heavy = result["heavy"]
+    return statistics.median(times), heavy
+
+
+if __name__ == "__main__":
+    print(f"⏱️  median of {RUNS} cold imports\n")
+    for module in ("interview_agent.agent", "interview_agent.advanced_scoring", "main"):
+        try:
+            seconds, heavy = measure(module)
+        except subprocess.CalledProcessError as e:
+            print(f"{module:<34} failed: {e.stderr.strip().splitlines()[-1]}")
+            continue
+        print(f"{module:<34} {seconds * 1000:8.1f} ms   heavy modules loaded: {heavy or 'none'}")
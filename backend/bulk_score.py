@@ -0,0 +1,200 @@
+"""
+Offline bulk re-scoring of interview transcripts.
+
+Streams a JSONL file of transcripts through `aggregate_report` and appends
+one JSON line per scored transcript to the output file. Nothing is loaded
+whole: transcripts are read lazily and at most --concurrency are in flight.
+
+Input lines:
+  {"id": "abc", "role": "software_engineer",
+   "qa_pairs": [{"question": "...", "answer": "..."}, ...]}
+("id" defaults to the line number.)
+
+Output lines:
+  {"id": "abc", "role": "...", "report": {...}}
+
+The output file doubles as the checkpoint: on start, ids already in it are
+skipped, so a killed run resumes where it stopped. Calls run in the
+scheduler's offline batch class, below live traffic. With --local, answers
+are scored by the rubric engine only (no LLM calls), e.g. after a rubric
+change.
+
+Without --local, a report with any heuristic evaluation (Gemini down, or
+batch calls shed) is not written, so the next run rescores it;
+--accept-heuristic writes such reports anyway.
+
+Run: python bulk_score.py transcripts.jsonl scored.jsonl --concurrency 8
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from typing import Any, AsyncIterator, Dict, Iterator, Set, Tuple
+
+from interview_agent import llm
+from interview_agent.advanced_scoring import aggregate_report, summarize_evaluations, EVAL_MODE
+from interview_agent.schemas import SOURCE_HEURISTIC
+from interview_agent.scoring import engine
+from interview_agent.scheduler import priority_class, BATCH
+
+
+def load_checkpoint(path: str) -> Set[str]:
+    """Ids already scored in `path`; drops a partial last line left by a kill."""
+    done: Set[str] = set()
+    if not os.path.exists(path):
+        return done
+
+    with open(path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+        for line in data[:end].splitlines():
+            try:
+                done.add(str(json.loads(line)["id"]))
+            except (ValueError, KeyError):
+                continue
+    return done
+
+
+def read_transcripts(path: str, skip: Set[str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield (id, transcript) lazily, skipping checkpointed ids and bad lines."""
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                print(f"⚠️  line {lineno}: invalid JSON, skipped", file=sys.stderr)
+                continue
+            tid = str(row.get("id", lineno))
+            if tid in skip:
+                continue
+            if not row.get("qa_pairs"):
+                print(f"⚠️  line {lineno}: no qa_pairs, skipped", file=sys.stderr)
+                continue
+            yield tid, row
+
+
+def local_report(pairs) -> Dict[str, Any]:
+    """Report from the local rubric engine, all pairs scored in one batch."""
+    results = engine.evaluate([p["answer"] for p in pairs], [p["question"] for p in pairs])
+    for result in results:
+        result["source"] = SOURCE_HEURISTIC
+    return summarize_evaluations(pairs, results)
+
+
+def heuristic_count(report: Dict[str, Any]) -> int:
+    """Answers in the report scored by the local fallback instead of Gemini."""
+    return report.get("final_summary", {}).get("evaluation_sources", {}).get(SOURCE_HEURISTIC, 0)
+
+
+async def score_all(
+    transcripts: Iterator[Tuple[str, Dict[str, Any]]],
+    concurrency: int,
+    mode: str,
+    eval_concurrency: int,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Score transcripts with at most `concurrency` in flight; yields in completion order."""
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    results: asyncio.Queue = asyncio.Queue()
+
+    async def producer():
+        for item in transcripts:
+            await queue.put(item)
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def worker():
+        while True:
+            item = await queue.get()
+            if item is None:
+                await results.put(None)
+                return
+            tid, row = item
+            role = row.get("role", "software_engineer")
+            pairs = [{"question": p["question"], "answer": p.get("answer", "")} for p in row["qa_pairs"]]
+            try:
+                if mode == "local":
+                    report = local_report(pairs)
+                else:
+                    report = await aggregate_report(role, pairs, max_concurrency=eval_concurrency, mode=mode)
+                await results.put({"id": tid, "role": role, "report": report, "_pairs": len(pairs)})
+            except Exception as e:
+                # not checkpointed, so the next run retries it
+                print(f"❌ {tid}: {type(e).__name__}: {e}", file=sys.stderr)
+
+    tasks = [asyncio.create_task(producer())] + [asyncio.create_task(worker()) for _ in range(concurrency)]
+    finished = 0
+    try:
+        while finished < concurrency:
+            record = await results.get()
+            if record is None:
+                finished += 1
+            else:
+                yield record
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL file of transcripts")
+    parser.add_argument("output", help="JSONL file of reports (appended; also the checkpoint)")
+    parser.add_argument("--concurrency", type=int, default=8, help="transcripts scored at once")
+    parser.add_argument("--eval-concurrency", type=int, default=4, help="LLM calls per transcript")
+    parser.add_argument("--mode", choices=("fanout", "batch"), default=EVAL_MODE)
+    parser.add_argument("--local", action="store_true", help="score with the local rubric engine only")
+    parser.add_argument(
+        "--accept-heuristic", action="store_true",
+        help="write reports with heuristic evaluations instead of leaving them for the next run",
+    )
+    args = parser.parse_args()
+
+    done = load_checkpoint(args.output)
+    if done:
+        print(f"↩️  resuming: {len(done)} transcripts already scored")
+
+    llm.reset_usage()
+    scored = pairs = deferred = 0
+    start = time.perf_counter()
+
+    with open(args.output, "a", encoding="utf-8") as out, priority_class(BATCH):
+        transcripts = read_transcripts(args.input, done)
+        async for record in score_all(
+            transcripts, max(1, args.concurrency), "local" if args.local else args.mode, args.eval_concurrency
+        ):
+            pairs += record.pop("_pairs")
+            if not (args.local or args.accept_heuristic) and heuristic_count(record["report"]):
+                # not checkpointed: rescored with Gemini on the next run
+                deferred += 1
+                continue
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            scored += 1
+            if scored % 50 == 0:
+                print(f"… {scored} transcripts, {pairs / (time.perf_counter() - start):.1f} pairs/sec")
+
+    elapsed = time.perf_counter() - start
+    usage = llm.usage_stats()
+    tokens = usage["input_tokens"] + usage["output_tokens"]
+    print(
+        f"\n✅ {scored} transcripts, {pairs} pairs in {elapsed:.1f}s → "
+        f"{pairs / elapsed if elapsed else 0:.1f} pairs/sec, "
+        f"{tokens / elapsed if elapsed else 0:.0f} tokens/sec "
+        f"({usage['requests']} LLM requests, {tokens} tokens)"
+    )
+    if deferred:
+        print(
+            f"⚠️  {deferred} transcripts had heuristic evaluations and were not written; "
+            f"rerun to rescore them (or pass --accept-heuristic)"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
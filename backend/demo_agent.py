@@ -3,6 +3,7 @@ print("🔥 Demo starting...")
 from interview_agent.agent import InterviewAgent
 from interview_agent.memory import SessionMemory
 import uuid
+import asyncio
 
 print("🔥 Imports successful!")
 
@@ -11,6 +12,6 @@ agent = InterviewAgent(memory=SessionMemory())
 session_id = str(uuid.uuid4())[:8]
 print("🔥 Session:", session_id)
 
-start = agent.start_interview(session_id, role="software_engineer")
+start = asyncio.run(agent.start_interview(session_id, role="software_engineer"))
 print("🔥 First Question:", start)
 
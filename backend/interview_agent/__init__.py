@@ -0,0 +1,4 @@
+# Load .env once, before any submodule reads its settings from os.environ
+from dotenv import load_dotenv
+
+load_dotenv(".env")
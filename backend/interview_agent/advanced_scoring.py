@@ -4,32 +4,68 @@ LLM-powered advanced scoring and final report generator.
 Outputs:
 - Per-answer evaluation with numeric scores (0-10)
 - Aggregated final report (averages, strengths, weaknesses, suggestions)
+
+Evaluations use structured output (see schemas.py) and carry a "source"
+field: "llm", "repaired" (fixed by one repair call) or "heuristic".
 """
 
 import os
 import json
-from typing import Dict, List, Any
-from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-
-load_dotenv(".env")
-GEMINI_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_KEY:
-    raise ValueError("GEMINI_API_KEY missing in .env")
-
-# Use same model that works for your agent
-_llm = ChatGoogleGenerativeAI(
-    model="models/gemini-2.5-flash",
-    temperature=0.2,
-    max_output_tokens=800,
-    google_api_key=GEMINI_KEY
+import time
+import asyncio
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+from .llm import call_llm, estimate_tokens
+from .resilience import LLMUnavailableError, LLM_DEGRADED
+from .metrics import STAGE_SECONDS, EVAL_PARSE_FALLBACKS, EVAL_PARSE_FAILURES, EVAL_WASTED_TOKENS
+from .prompt_builder import compile_prompt, fit_to_budget, EVAL_ANSWER_BUDGET
+from .scoring import engine as local_engine
+from .near_duplicates import index_from_env
+from .schemas import (
+    SCORE_KEYS,
+    LIST_KEYS,
+    EVALUATION_SCHEMA,
+    BATCH_EVALUATION_SCHEMA,
+    SOURCE_LLM,
+    SOURCE_REPAIRED,
+    SOURCE_HEURISTIC,
+    evaluation_errors,
 )
 
-def _call_llm(prompt: str) -> str:
-    resp = _llm.invoke(prompt)
-    if hasattr(resp, "content"):
-        return resp.content.strip()
-    return str(resp).strip()
+
+async def _call_llm(
+    prompt: str,
+    max_output_tokens: int = 800,
+    stage: str = "evaluate",
+    response_schema: Optional[Dict[str, Any]] = EVALUATION_SCHEMA,
+    validate: Optional[Callable[[str], bool]] = None,
+) -> str:
+    return await call_llm(
+        prompt,
+        temperature=0.2,
+        max_output_tokens=max_output_tokens,
+        stage=stage,
+        response_schema=response_schema,
+        validate=validate or _is_valid_evaluation,
+    )
+
+# Fan-out limits for aggregate_report (overridable per call)
+EVAL_MAX_CONCURRENCY = int(os.getenv("EVAL_MAX_CONCURRENCY", "8"))
+EVAL_TIMEOUT_SECONDS = float(os.getenv("EVAL_TIMEOUT_SECONDS", "30"))
+
+# "fanout": one Gemini call per Q&A pair; "batch": many pairs per call
+EVAL_MODE = os.getenv("EVAL_MODE", "fanout")
+# Input-token budget per batched prompt, and cap on pairs per batch
+BATCH_TOKEN_BUDGET = int(os.getenv("BATCH_TOKEN_BUDGET", "6000"))
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "10"))
+# Output tokens reserved for each evaluation inside a batch
+BATCH_OUTPUT_TOKENS_PER_ITEM = 250
+# Repair calls only resend the broken output, never the Q&A pair
+REPAIR_OUTPUT_TOKEN_BUDGET = 400
+REPAIR_MAX_OUTPUT_TOKENS = 400
+# Evaluations reused for near-duplicate answers (None when NEAR_DUP_ENABLED=0)
+near_duplicates = index_from_env()
+
 
 # Prompt template: strict JSON output
 EVAL_PROMPT_TEMPLATE = """
@@ -62,53 +98,340 @@ Return EXACT JSON:
 }}
 """
 
-def evaluate_answer(role: str, question: str, answer: str) -> Dict[str, Any]:
-    """Run Gemini evaluation with JSON output."""
-    prompt = EVAL_PROMPT_TEMPLATE.format(role=role, question=question, answer=answer)
-    raw = _call_llm(prompt)
+# Batched variant: the instructions are sent once for many Q&A pairs
+BATCH_EVAL_PROMPT_TEMPLATE = """
+You are an expert interview evaluator. Evaluate EACH of the following Q&A pairs and return ONLY a valid JSON array (no commentary).
+
+Role: {role}
+
+For every pair evaluate these categories (0-10):
+- technical
+- communication
+- problem_solving
+- structure
+
+Also include for every pair:
+- strengths: ["..",".."]
+- weaknesses: ["..",".."]
+- suggestions: ["..",".."]
+
+Return EXACT JSON, one object per pair, using the pair's id:
+[
+  {{
+    "id": <pair id>,
+    "technical": <number>,
+    "communication": <number>,
+    "problem_solving": <number>,
+    "structure": <number>,
+    "strengths": ["...","..."],
+    "weaknesses": ["...","..."],
+    "suggestions": ["...","..."]
+  }}
+]
+
+Q&A pairs:
+{pairs}
+"""
+
+BATCH_PAIR_TEMPLATE = """
+[id {id}]
+Question: {question}
+User Answer: {answer}
+"""
+
+# Targeted repair: fix the shape of a broken evaluation, nothing else
+REPAIR_PROMPT_TEMPLATE = """
+This interview evaluation output does not match the required JSON schema.
+
+Problems: {errors}
 
-    # Try parsing JSON
-    parsed = None
+Output:
+{output}
+
+Rewrite it as valid JSON. Keep the existing scores and wording where present; fill anything missing sensibly.
+Return EXACT JSON:
+{{
+  "technical": <number 0-10>,
+  "communication": <number 0-10>,
+  "problem_solving": <number 0-10>,
+  "structure": <number 0-10>,
+  "strengths": ["...","..."],
+  "weaknesses": ["...","..."],
+  "suggestions": ["...","..."]
+}}
+"""
+
+def _pair_block(i: int, pair: Dict[str, str]) -> str:
+    """One [id N] entry of a batched prompt, with the answer held to budget."""
+    answer = fit_to_budget(pair["answer"], EVAL_ANSWER_BUDGET)
+    return BATCH_PAIR_TEMPLATE.format(id=i, question=pair["question"], answer=answer)
+
+def _load_json(raw: str, opening: str, closing: str) -> Tuple[Any, bool]:
+    """json.loads, else the outermost opening..closing slice; returns (value, sliced)."""
     try:
-        parsed = json.loads(raw)
+        return json.loads(raw), False
     except Exception:
-        start = raw.find("{")
-        end = raw.rfind("}")
+        start = raw.find(opening)
+        end = raw.rfind(closing)
         if start != -1 and end != -1:
             try:
-                parsed = json.loads(raw[start:end+1])
-            except:
-                parsed = None
-
-    if not parsed:
-        # fallback if Gemini returns invalid JSON
-        words = len(answer.split())
-        technical = min(9.0, max(1.0, words / 10))
-        communication = 7.0 if words > 8 else 4.0
-        problem_solving = technical * 0.9
-        structure = 7.0 if words > 10 else 5.0
-        return {
-            "technical": round(technical, 1),
-            "communication": round(communication, 1),
-            "problem_solving": round(problem_solving, 1),
-            "structure": round(structure, 1),
-            "strengths": ["Concise", "Relevant"],
-            "weaknesses": ["Needs more detail", "No examples"],
-            "suggestions": ["Add examples", "Explain step-by-step"]
-        }
+                return json.loads(raw[start:end+1]), True
+            except Exception:
+                pass
+    return None, False
+
+def _parse_evaluation(raw: str) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    """Parse and validate one evaluation; returns (result, schema errors)."""
+    parsed, sliced = _load_json(raw, "{", "}")
+    if parsed is None:
+        return None, ["output is not valid JSON"]
+    if sliced:
+        EVAL_PARSE_FALLBACKS.inc("brace_slice")
+
+    errors = evaluation_errors(parsed)
+    if errors:
+        return None, errors
+    return {k: parsed[k] for k in SCORE_KEYS + LIST_KEYS}, []
+
+def _is_valid_evaluation(raw: str) -> bool:
+    """Cache check: only evaluations that pass the schema are cached."""
+    parsed, _ = _load_json(raw, "{", "}")
+    return parsed is not None and not evaluation_errors(parsed)
+
+async def evaluate_answer(role: str, question: str, answer: str) -> Dict[str, Any]:
+    """
+    Run a structured-output Gemini evaluation.
+
+    Output that fails schema validation gets one targeted repair call; if
+    that fails too, the heuristic estimate is used. The result's "source"
+    records which path produced it. A near-duplicate of an answer already
+    evaluated for the same question reuses that evaluation.
+    """
+    started = time.perf_counter()
+    reused = _reuse_evaluation(role, question, answer)
+    if reused is not None:
+        STAGE_SECONDS.since(started, "evaluate_answer")
+        return reused
+
+    prompt = compile_prompt(
+        "evaluate",
+        EVAL_PROMPT_TEMPLATE,
+        {"answer": EVAL_ANSWER_BUDGET},
+        role=role,
+        question=question,
+        answer=answer,
+    )
+    try:
+        raw = await _call_llm(prompt)
+    except LLMUnavailableError:
+        LLM_DEGRADED.inc("evaluate")
+        STAGE_SECONDS.since(started, "evaluate_answer")
+        return _heuristic_evaluation(question, answer)
+    result, errors = _parse_evaluation(raw)
+    source = SOURCE_LLM
+
+    if errors:
+        EVAL_PARSE_FAILURES.inc("evaluate")
+        EVAL_WASTED_TOKENS.inc("evaluate", amount=estimate_tokens(prompt) + estimate_tokens(raw))
+
+        repair_prompt = compile_prompt(
+            "evaluate_repair",
+            REPAIR_PROMPT_TEMPLATE,
+            {"output": REPAIR_OUTPUT_TOKEN_BUDGET},
+            errors="; ".join(errors),
+            output=raw,
+        )
+        try:
+            raw = await _call_llm(repair_prompt, REPAIR_MAX_OUTPUT_TOKENS, stage="evaluate_repair")
+        except LLMUnavailableError:
+            LLM_DEGRADED.inc("evaluate_repair")
+        else:
+            result, errors = _parse_evaluation(raw)
+            source = SOURCE_REPAIRED
+            if errors:
+                EVAL_PARSE_FAILURES.inc("evaluate_repair")
+                EVAL_WASTED_TOKENS.inc(
+                    "evaluate_repair", amount=estimate_tokens(repair_prompt) + estimate_tokens(raw)
+                )
+
+    STAGE_SECONDS.since(started, "evaluate_answer")
+
+    if errors:
+        EVAL_PARSE_FALLBACKS.inc("heuristic")
+        return _heuristic_evaluation(question, answer)
+
+    if source == SOURCE_REPAIRED:
+        EVAL_PARSE_FALLBACKS.inc("repaired")
+    result["source"] = source
+    _remember_evaluation(role, question, answer, result)
+    return result
+
+def _reuse_evaluation(role: str, question: str, answer: str) -> Optional[Dict[str, Any]]:
+    """Copy of a stored evaluation of a near-duplicate answer, if any."""
+    if near_duplicates is None:
+        return None
+    match = near_duplicates.lookup(role, question, answer)
+    if match is None:
+        return None
+    evaluation, similarity = match
+    return {**evaluation, "near_duplicate": {"similarity": round(similarity, 3)}}
+
+def _remember_evaluation(role: str, question: str, answer: str, result: Dict[str, Any]):
+    # heuristic estimates are never stored: they are cheap to recompute
+    # and would keep the answer from ever getting an LLM evaluation
+    if near_duplicates is not None and result.get("source") != SOURCE_HEURISTIC:
+        near_duplicates.add(role, question, answer, dict(result))
 
-    return parsed
+def _heuristic_evaluation(question: str, answer: str) -> Dict[str, Any]:
+    """
+    Local rubric-based evaluation (scoring.py) used when Gemini output is
+    unusable or Gemini is unavailable; the report flags these answers.
+    """
+    result = local_engine.evaluate([answer], [question])[0]
+    result["source"] = SOURCE_HEURISTIC
+    return result
 
-def aggregate_report(role: str, qa_pairs: List[Dict[str, str]]) -> Dict[str, Any]:
-    """Aggregate per-answer scores into a final interview report."""
-    scores_sum = {"technical": 0, "communication": 0, "problem_solving": 0, "structure": 0}
+async def evaluate_pairs(
+    role: str,
+    qa_pairs: List[Dict[str, str]],
+    max_concurrency: int = EVAL_MAX_CONCURRENCY,
+    timeout: float = EVAL_TIMEOUT_SECONDS,
+) -> List[Dict[str, Any]]:
+    """
+    Evaluate all Q&A pairs concurrently.
+
+    At most `max_concurrency` Gemini calls are in flight at once; a call that
+    exceeds `timeout` seconds falls back to the heuristic evaluation.
+    Results are returned in question order.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _evaluate(pair: Dict[str, str]) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(
+                    evaluate_answer(role, pair["question"], pair["answer"]), timeout
+                )
+            except asyncio.TimeoutError:
+                return _heuristic_evaluation(pair["question"], pair["answer"])
+
+    return await asyncio.gather(*(_evaluate(pair) for pair in qa_pairs))
+
+def _parse_batch(raw: str) -> Dict[int, Dict[str, Any]]:
+    """Parse a batched response into {pair id: evaluation}, skipping bad items."""
+    parsed, _ = _load_json(raw, "[", "]")
+
+    if not isinstance(parsed, list):
+        return {}
+
+    results = {}
+    for item in parsed:
+        if not isinstance(item, dict) or evaluation_errors(item) or not isinstance(item.get("id"), int):
+            continue
+        results[item["id"]] = {k: item[k] for k in SCORE_KEYS + LIST_KEYS}
+        results[item["id"]]["source"] = SOURCE_LLM
+    return results
+
+def _chunk_pairs(
+    role: str, qa_pairs: List[Dict[str, str]], token_budget: int, max_items: int
+) -> List[List[int]]:
+    """Group pair indexes so each batched prompt stays within the token budget."""
+    base = estimate_tokens(BATCH_EVAL_PROMPT_TEMPLATE.format(role=role, pairs=""))
+    chunks, current, used = [], [], base
+    for i, pair in enumerate(qa_pairs):
+        cost = estimate_tokens(_pair_block(i, pair))
+        if current and (used + cost > token_budget or len(current) >= max_items):
+            chunks.append(current)
+            current, used = [], base
+        current.append(i)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+async def evaluate_pairs_batched(
+    role: str,
+    qa_pairs: List[Dict[str, str]],
+    token_budget: int = BATCH_TOKEN_BUDGET,
+    max_items: int = BATCH_MAX_ITEMS,
+    max_concurrency: int = EVAL_MAX_CONCURRENCY,
+    timeout: float = EVAL_TIMEOUT_SECONDS,
+) -> List[Dict[str, Any]]:
+    """
+    Evaluate Q&A pairs with one Gemini call per size-bounded batch.
+
+    Pairs missing from (or invalid in) a batched response are re-scored
+    individually through `evaluate_pairs`; near-duplicates of answers already
+    evaluated are reused without a call. Results are in question order.
+    """
+    results: List[Any] = [
+        _reuse_evaluation(role, pair["question"], pair["answer"]) for pair in qa_pairs
+    ]
+    pending = [i for i, r in enumerate(results) if r is None]
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _evaluate_chunk(indexes: List[int]):
+        pairs = "".join(_pair_block(i, qa_pairs[i]) for i in indexes)
+        truncated = sum(
+            estimate_tokens(qa_pairs[i]["answer"])
+            - estimate_tokens(fit_to_budget(qa_pairs[i]["answer"], EVAL_ANSWER_BUDGET))
+            for i in indexes
+        )
+        prompt = compile_prompt(
+            "evaluate_batch", BATCH_EVAL_PROMPT_TEMPLATE, overhead_saved=truncated, role=role, pairs=pairs
+        )
+        async with semaphore:
+            try:
+                raw = await asyncio.wait_for(
+                    _call_llm(
+                        prompt,
+                        BATCH_OUTPUT_TOKENS_PER_ITEM * len(indexes),
+                        stage="evaluate_batch",
+                        response_schema=BATCH_EVALUATION_SCHEMA,
+                        validate=lambda raw: set(indexes) <= set(_parse_batch(raw)),
+                    ),
+                    timeout,
+                )
+            except (asyncio.TimeoutError, LLMUnavailableError):
+                # its pairs are re-scored individually below
+                return
+        parsed = {i: result for i, result in _parse_batch(raw).items() if i in indexes}
+        if len(parsed) < len(indexes):
+            EVAL_PARSE_FAILURES.inc("evaluate_batch", amount=len(indexes) - len(parsed))
+            if not parsed:
+                EVAL_WASTED_TOKENS.inc("evaluate_batch", amount=estimate_tokens(prompt) + estimate_tokens(raw))
+        for i, result in parsed.items():
+            results[i] = result
+            _remember_evaluation(role, qa_pairs[i]["question"], qa_pairs[i]["answer"], result)
+
+    chunks = [
+        [pending[i] for i in chunk]
+        for chunk in _chunk_pairs(role, [qa_pairs[i] for i in pending], token_budget, max_items)
+    ]
+    await asyncio.gather(*(_evaluate_chunk(chunk) for chunk in chunks))
+
+    missing = [i for i, r in enumerate(results) if r is None]
+    if missing:
+        EVAL_PARSE_FALLBACKS.inc("batch_rescore", amount=len(missing))
+        rescored = await evaluate_pairs(
+            role, [qa_pairs[i] for i in missing], max_concurrency, timeout
+        )
+        for i, result in zip(missing, rescored):
+            results[i] = result
+    return results
+
+def summarize_evaluations(
+    qa_pairs: List[Dict[str, str]], results: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Merge per-answer evaluations (in question order) into the final report."""
+    scores_sum = {k: 0 for k in SCORE_KEYS}
     per_question = []
     strengths, weaknesses, suggestions = [], [], []
+    sources = {SOURCE_LLM: 0, SOURCE_REPAIRED: 0, SOURCE_HEURISTIC: 0}
 
-    for pair in qa_pairs:
+    for pair, result in zip(qa_pairs, results):
         q = pair["question"]
         a = pair["answer"]
-        result = evaluate_answer(role, q, a)
 
         per_question.append({
             "question": q,
@@ -118,6 +441,8 @@ def aggregate_report(role: str, qa_pairs: List[Dict[str, str]]) -> Dict[str, Any
 
         for k in scores_sum:
             scores_sum[k] += float(result[k])
+        source = result.get("source", SOURCE_LLM)
+        sources[source] = sources.get(source, 0) + 1
 
         for item in result["strengths"]:
             if item not in strengths:
@@ -142,7 +467,42 @@ def aggregate_report(role: str, qa_pairs: List[Dict[str, str]]) -> Dict[str, Any
             "averages": avg_scores,
             "top_strengths": strengths[:3],
             "top_weaknesses": weaknesses[:3],
-            "top_suggestions": suggestions[:3]
+            "top_suggestions": suggestions[:3],
+            # how many answers were scored by the model, after repair, or heuristically
+            "evaluation_sources": sources
         }
     }
 
+async def evaluate_all(
+    role: str,
+    qa_pairs: List[Dict[str, str]],
+    max_concurrency: int = EVAL_MAX_CONCURRENCY,
+    timeout: float = EVAL_TIMEOUT_SECONDS,
+    mode: str = EVAL_MODE,
+) -> List[Dict[str, Any]]:
+    """
+    Evaluate pairs in question order: mode="fanout" gives each pair its own
+    call; mode="batch" packs pairs into token-bounded batched prompts.
+    """
+    if mode == "batch":
+        return await evaluate_pairs_batched(
+            role, qa_pairs, max_concurrency=max_concurrency, timeout=timeout
+        )
+    return await evaluate_pairs(role, qa_pairs, max_concurrency, timeout)
+
+async def aggregate_report(
+    role: str,
+    qa_pairs: List[Dict[str, str]],
+    max_concurrency: int = EVAL_MAX_CONCURRENCY,
+    timeout: float = EVAL_TIMEOUT_SECONDS,
+    mode: str = EVAL_MODE,
+) -> Dict[str, Any]:
+    """
+    Aggregate per-answer scores into a final interview report
+    (see `evaluate_all` for the modes).
+    """
+    started = time.perf_counter()
+    results = await evaluate_all(role, qa_pairs, max_concurrency, timeout, mode)
+    report = summarize_evaluations(qa_pairs, results)
+    STAGE_SECONDS.since(started, "aggregate_report")
+    return report
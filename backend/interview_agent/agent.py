@@ -8,138 +8,174 @@ InterviewAgent implementation with:
 - Evaluation
 """
 
-import os
-from typing import Optional, Dict, Any
-from dotenv import load_dotenv
+import re
+import time
+from typing import Optional, Dict, Any, AsyncIterator, Tuple
 
-from .prompts import SYSTEM_PROMPT, QUESTION_TEMPLATES, BEHAVIOR_CLASSIFIER_PROMPT
+from .prompts import SYSTEM_PROMPT, CLASSIFIER_PROMPT_TEMPLATE
 from .memory import SessionMemory
+from .question_bank import bank as question_bank
 from .scoring import ScoreEngine
+from .background import BackgroundScorer
+from .locks import SessionLocks
+from .metrics import STAGE_SECONDS
+from .llm import call_llm, estimate_tokens
+from .resilience import LLMUnavailableError, LLM_DEGRADED
+from .classifier import fast_classify
+from .followup import stream_followup
+from .prompt_builder import compile_prompt, CLASSIFY_ANSWER_BUDGET
 
-from langchain_google_genai import ChatGoogleGenerativeAI
+# The classifier used to be sent the full interviewer SYSTEM_PROMPT
+_SYSTEM_PROMPT_TOKENS = estimate_tokens(SYSTEM_PROMPT)
 
-# Load API Key
-load_dotenv(".env")
-GEMINI_KEY = os.getenv("GEMINI_API_KEY")
 
-if not GEMINI_KEY:
-    raise ValueError("❌ ERROR: GEMINI_API_KEY not found in .env")
+async def _call_llm(prompt: str) -> str:
+    """
+    Calls Gemini through the shared async gateway.
+    """
+    return await call_llm(prompt, temperature=0.2, max_output_tokens=600, stage="classify")
 
 
-# Initialize Gemini LLM
-_llm = ChatGoogleGenerativeAI(
-    model="models/gemini-2.5-flash",
-    temperature=0.2,
-    max_output_tokens=600,
-    google_api_key=GEMINI_KEY
-)
+def iter_message_tokens(message: str):
+    """Split a reply into word-sized chunks (whitespace kept) for streaming."""
+    return re.findall(r"\s*\S+\s*", message)
 
 
-def _call_llm(prompt: str) -> str:
-    """
-    Calls Gemini via LangChain wrapper.
-    """
-    response = _llm.invoke(prompt)
+def _question_picker(topic: Optional[str] = None, difficulty: Optional[str] = None):
+    """Question selection run by the store inside the session's write transaction."""
+    def pick(role: str, state: Optional[Dict[str, Any]]):
+        # per-session cursor + used-id bitmap → O(1) selection
+        state = dict(state or {})
+        state["cursors"] = dict(state.get("cursors", {}))
+        question = question_bank.next_question(role, state, topic=topic, difficulty=difficulty)
+        if question is None:
+            return state, None
+        metadata = {"difficulty": question.difficulty, "topic": question.topic, "question_id": question.id}
+        return state, (question.text, metadata)
+    return pick
 
-    # LangChain returns .content for chat models
-    if hasattr(response, "content"):
-        return response.content.strip()
 
-    return str(response).strip()
+def _session_not_found() -> Dict[str, Any]:
+    """Reply for a session that never existed, expired or was evicted."""
+    return {
+        "type": "error",
+        "message": "No session found with this ID. Please start a new interview.",
+        "metadata": {"error": "session_not_found"}
+    }
 
 
 class InterviewAgent:
     def __init__(self, memory: Optional[SessionMemory] = None):
         self.memory = memory or SessionMemory()
         self.scorer = ScoreEngine()
+        self.background = BackgroundScorer(self.memory)
+        self.locks = SessionLocks()
 
     # ----------------------------------------------------------
     # START INTERVIEW
     # ----------------------------------------------------------
-    def start_interview(self, session_id: str, role: str) -> Dict[str, Any]:
+    async def start_interview(self, session_id: str, role: str) -> Dict[str, Any]:
         """Creates session & returns first interview question."""
-        self.memory.create_session(session_id, role)
-
-        templates = QUESTION_TEMPLATES.get(
-            role, QUESTION_TEMPLATES["software_engineer"]
-        )
-        first_question = templates[0]
+        await self.memory.create_session(session_id, role)
 
-        metadata = {"difficulty": "easy", "topic": role}
-
-        self.memory.append_question(session_id, first_question, metadata)
+        text, metadata = await self.memory.advance_question(session_id, "question_bank", _question_picker())
 
         return {
             "type": "interviewer_question",
-            "message": first_question,
+            "message": text,
             "metadata": metadata
         }
 
     # ----------------------------------------------------------
     # ASK NEXT QUESTION
     # ----------------------------------------------------------
-    def ask_next_question(self, session_id: str) -> Dict[str, Any]:
-        session = self.memory.get(session_id)
-
-        role = session["role"]
-        asked_qs = {q["q"] for q in session["questions_asked"]}
-
-        templates = QUESTION_TEMPLATES.get(
-            role, QUESTION_TEMPLATES["software_engineer"]
+    async def ask_next_question(
+        self, session_id: str, topic: Optional[str] = None, difficulty: Optional[str] = None
+    ) -> Dict[str, Any]:
+        picked = await self.memory.advance_question(
+            session_id, "question_bank", _question_picker(topic, difficulty)
         )
 
-        next_q = None
-        for q in templates:
-            if q not in asked_qs:
-                next_q = q
-                break
-
-        if not next_q:
+        if not picked:
             return {
                 "type": "final_summary",
                 "message": "We completed the planned questions. Would you like detailed feedback?",
                 "metadata": {"topic": "wrap-up", "difficulty": "easy"}
             }
 
-        metadata = {"difficulty": "medium", "topic": role}
-        self.memory.append_question(session_id, next_q, metadata)
-
+        text, metadata = picked
         return {
             "type": "interviewer_question",
-            "message": next_q,
+            "message": text,
             "metadata": metadata
         }
 
     # ----------------------------------------------------------
     # HANDLE ANSWER (behavior + follow-up + evaluation)
     # ----------------------------------------------------------
-    def handle_answer(self, session_id: str, answer: str) -> Dict[str, Any]:
-        session = self.memory.get(session_id)
-        self.memory.append_answer(session_id, answer)
-        self.memory.increment_turn(session_id)
-
-        last_q = session["last_question"]
-
-        # 1️⃣ Classify user behavior
-        classify_prompt = f"""
-{SYSTEM_PROMPT}
-
-Classify the user's behavior.
-
-User message:
-{answer}
-
-{BEHAVIOR_CLASSIFIER_PROMPT}
-"""
-
-        behavior = _call_llm(classify_prompt).strip().upper()
+    async def handle_answer(self, session_id: str, answer: str) -> Dict[str, Any]:
+        # Serialize turns per session in this process; across workers the
+        # store records each answer atomically at its own index
+        async with self.locks.hold(session_id):
+            turn = await self.memory.record_answer(session_id, answer)
+            if turn is None:
+                return _session_not_found()
+            return await self._handle_answer(session_id, turn, answer)
+
+    async def _handle_answer(self, session_id: str, turn: Dict[str, Any], answer: str) -> Dict[str, Any]:
+        behavior, last_q, _ = await self._begin_turn(session_id, turn, answer)
+
+        # Short answers keep the instant canned follow-up here; a follow-up
+        # written for the answer is only generated when it can be streamed
+        # (stream_answer), so it never blocks a /chat reply
+        start = time.perf_counter()
+        response = await self._route(session_id, behavior, answer, last_q)
+        STAGE_SECONDS.since(start, "routing")
+        return response
+
+    async def _begin_turn(self, session_id: str, turn: Dict[str, Any], answer: str) -> Tuple[str, str, str]:
+        """Classify a recorded answer (see record_answer); returns (behavior, last question, role)."""
+        # Score this Q&A pair in the background so /report only aggregates
+        if turn["question"] is not None:
+            await self.background.submit(session_id, turn["role"], turn["index"], turn["question"], answer)
+
+        last_q = turn["last_question"]
+
+        # 1️⃣ Classify user behavior (local rules first, Gemini if ambiguous)
+        start = time.perf_counter()
+        behavior = fast_classify(answer)
+
+        if behavior is None:
+            classify_prompt = compile_prompt(
+                "classify",
+                CLASSIFIER_PROMPT_TEMPLATE,
+                {"answer": CLASSIFY_ANSWER_BUDGET},
+                overhead_saved=_SYSTEM_PROMPT_TOKENS,
+                answer=answer,
+            )
+
+            try:
+                behavior = (await _call_llm(classify_prompt)).strip().upper()
+                STAGE_SECONDS.since(start, "classify_llm")
+            except LLMUnavailableError:
+                # Gemini down or too slow: the local rules found nothing
+                # unusual, so treat it as a normal answer
+                LLM_DEGRADED.inc("classify")
+                behavior = "NORMAL"
+                STAGE_SECONDS.since(start, "classify_degraded")
+        else:
+            STAGE_SECONDS.since(start, "classify_fast")
 
         # DEBUG print (optional)
         # print("BEHAVIOR:", behavior)
+        return behavior, last_q, turn["role"]
 
+    async def _route(
+        self, session_id: str, behavior: str, answer: str, last_q: str, followup: Optional[str] = None
+    ) -> Dict[str, Any]:
         # 2️⃣ Routing logic
         if behavior == "CONFUSED":
-            self.memory.increment_confusion(session_id)
+            await self.memory.increment_confusion(session_id)
             return {
                 "type": "interviewer_question",
                 "message": f"Sure, let me simplify that:\n\n{last_q}",
@@ -147,7 +183,7 @@ User message:
             }
 
         if behavior == "OFF_TOPIC":
-            self.memory.increment_off_topic(session_id)
+            await self.memory.increment_off_topic(session_id)
             return {
                 "type": "interviewer_question",
                 "message": f"Let's stay focused. Please answer the question again:\n\n{last_q}",
@@ -164,7 +200,7 @@ User message:
         if behavior == "SHORT_ANSWER":
             return {
                 "type": "followup_question",
-                "message": "Can you explain that more? Give me more detail.",
+                "message": followup or "Can you explain that more? Give me more detail.",
                 "metadata": {"topic": "depth", "difficulty": "medium"}
             }
 
@@ -175,8 +211,10 @@ User message:
                 "metadata": {"topic": "summary", "difficulty": "medium"}
             }
 
-        # 3️⃣ Normal answer → simple scoring
-        scores = self.scorer.simple_scoring(answer)
+        # 3️⃣ Normal answer → local rubric scoring against the current question
+        start = time.perf_counter()
+        scores = self.scorer.simple_scoring(answer, last_q)
+        STAGE_SECONDS.since(start, "simple_scoring")
 
         evaluation_msg = (
             f"Evaluation:\n"
@@ -191,11 +229,43 @@ User message:
             "metadata": {"scores": scores}
         }
 
+    # ----------------------------------------------------------
+    # STREAMING (token events, then the full response envelope)
+    # ----------------------------------------------------------
+    async def stream_answer(self, session_id: str, answer: str) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Yield ("token", text) chunks of the interviewer reply as soon as it is
+        known, then ("done", response) with the usual type/metadata envelope.
+        Follow-up questions stream as Gemini generates them.
+        """
+        async with self.locks.hold(session_id):
+            turn = await self.memory.record_answer(session_id, answer)
+            if turn is None:
+                response = _session_not_found()
+                yield "token", response["message"]
+                yield "done", response
+                return
+            behavior, last_q, role = await self._begin_turn(session_id, turn, answer)
+
+            followup = None
+            if behavior == "SHORT_ANSWER":
+                parts = []
+                async for chunk in stream_followup(last_q, answer, role):
+                    parts.append(chunk)
+                    yield "token", chunk
+                followup = "".join(parts)
+
+            response = await self._route(session_id, behavior, answer, last_q, followup)
+        if followup is None:
+            for token in iter_message_tokens(response["message"]):
+                yield "token", token
+        yield "done", response
+
     # ----------------------------------------------------------
     # END INTERVIEW
     # ----------------------------------------------------------
-    def end_interview(self, session_id: str) -> Dict[str, Any]:
-        session = self.memory.end_session(session_id)
+    async def end_interview(self, session_id: str) -> Dict[str, Any]:
+        session = await self.memory.end_session(session_id)
 
         if not session:
             return {
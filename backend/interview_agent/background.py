@@ -0,0 +1,135 @@
+"""
+Incremental background scoring.
+
+Each answer is evaluated as soon as it arrives, and the result is stored on
+the session (keyed by question index). At report time only pairs that were
+never scored, or whose question/answer changed since, are evaluated again,
+through `evaluate_all` with the configured mode (EVAL_MODE), concurrency cap
+(EVAL_MAX_CONCURRENCY) and per-call timeout (EVAL_TIMEOUT_SECONDS). Waiting
+for an in-flight evaluation is bounded by the same timeout.
+"""
+
+import asyncio
+from typing import Dict, List, Any, Optional, Tuple, AsyncIterator
+
+from .memory import SessionMemory
+from .advanced_scoring import (
+    evaluate_answer,
+    evaluate_all,
+    _heuristic_evaluation,
+    EVAL_MAX_CONCURRENCY,
+    EVAL_TIMEOUT_SECONDS,
+    EVAL_MODE,
+)
+from .schemas import SOURCE_HEURISTIC
+
+
+class BackgroundScorer:
+    def __init__(
+        self,
+        memory: SessionMemory,
+        max_concurrency: int = EVAL_MAX_CONCURRENCY,
+        timeout: float = EVAL_TIMEOUT_SECONDS,
+        mode: str = EVAL_MODE,
+    ):
+        self.memory = memory
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.mode = mode
+        # (session_id, index) -> (question, answer, task)
+        self._tasks: Dict[Tuple[str, int], Tuple[str, str, asyncio.Task]] = {}
+
+    async def _stored(self, session_id: str, index: int, question: str, answer: str):
+        entry = await self.memory.get_evaluation(session_id, index)
+        if entry and entry["question"] == question and entry["answer"] == answer:
+            return entry["result"]
+        return None
+
+    async def submit(self, session_id: str, role: str, index: int, question: str, answer: str) -> Optional[asyncio.Task]:
+        """Queue evaluation of one Q&A pair unless it is already scored or in flight."""
+        if await self._stored(session_id, index, question, answer) is not None:
+            return None
+
+        key = (session_id, index)
+        pending = self._tasks.get(key)
+        if pending and pending[0] == question and pending[1] == answer:
+            return pending[2]
+
+        task = asyncio.create_task(self._run(session_id, role, index, question, answer))
+        self._tasks[key] = (question, answer, task)
+        return task
+
+    async def _run(self, session_id: str, role: str, index: int, question: str, answer: str):
+        try:
+            result = await evaluate_answer(role, question, answer)
+        except Exception:
+            # leave it unscored; collect() retries it at report time
+            return None
+        else:
+            await self._store(session_id, index, question, answer, result)
+            return result
+        finally:
+            entry = self._tasks.get((session_id, index))
+            if entry and entry[2] is asyncio.current_task():
+                del self._tasks[(session_id, index)]
+
+    async def _store(self, session_id: str, index: int, question: str, answer: str, result: Dict[str, Any]):
+        # heuristic scores (LLM unavailable) are not persisted, so the
+        # report re-tries the model for them; a session gone since is skipped
+        if result.get("source") != SOURCE_HEURISTIC:
+            await self.memory.set_evaluation(session_id, index, question, answer, result)
+
+    async def _score(
+        self, session_id: str, role: str, indexes: List[int], qa_pairs: List[Dict[str, str]]
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        """Evaluate the given pairs now (configured mode, cap and timeout) and store them."""
+        pairs = [qa_pairs[i] for i in indexes]
+        results = await evaluate_all(role, pairs, self.max_concurrency, self.timeout, self.mode)
+        for i, pair, result in zip(indexes, pairs, results):
+            await self._store(session_id, i, pair["question"], pair["answer"], result)
+        return list(zip(indexes, results))
+
+    async def _await_pending(
+        self, session_id: str, role: str, index: int, task: asyncio.Task, qa_pairs: List[Dict[str, str]]
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        pair = qa_pairs[index]
+        try:
+            result = await asyncio.wait_for(asyncio.shield(task), self.timeout)
+        except asyncio.TimeoutError:
+            # the background call keeps going and is stored if it finishes
+            return [(index, _heuristic_evaluation(pair["question"], pair["answer"]))]
+        if result is None:
+            return await self._score(session_id, role, [index], qa_pairs)
+        return [(index, result)]
+
+    async def collect(self, session_id: str, role: str, qa_pairs: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Return evaluations for all pairs in question order, awaiting in-flight
+        work and scoring only what is missing or stale.
+        """
+        results: List[Any] = [None] * len(qa_pairs)
+        async for index, result in self.stream(session_id, role, qa_pairs):
+            results[index] = result
+        return results
+
+    async def stream(self, session_id: str, role: str, qa_pairs: List[Dict[str, str]]) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """Like collect(), but yield (index, evaluation) in completion order."""
+        waits, missing = [], []
+        for i, pair in enumerate(qa_pairs):
+            q, a = pair["question"], pair["answer"]
+            stored = await self._stored(session_id, i, q, a)
+            if stored is not None:
+                yield i, stored
+                continue
+            pending = self._tasks.get((session_id, i))
+            if pending and pending[0] == q and pending[1] == a:
+                waits.append(self._await_pending(session_id, role, i, pending[2], qa_pairs))
+            else:
+                missing.append(i)
+
+        # missing pairs are scored together, so batch mode can pack them
+        if missing:
+            waits.append(self._score(session_id, role, missing, qa_pairs))
+        for group in asyncio.as_completed(waits):
+            for index, result in await group:
+                yield index, result
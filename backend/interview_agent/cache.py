@@ -0,0 +1,137 @@
+"""
+Content-addressed cache for LLM responses.
+
+Keys are a hash of (model, temperature, max_output_tokens, prompt), so an
+identical request always maps to the same entry. Entries live in a bounded
+in-memory LRU with a TTL, optionally backed by a SQLite file that survives
+restarts.
+"""
+
+import os
+import time
+import json
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+def make_key(model: str, temperature: float, max_output_tokens: int, prompt: str) -> str:
+    payload = json.dumps([model, temperature, max_output_tokens, prompt])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """LRU + TTL response cache with an optional SQLite persistent tier."""
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        ttl_seconds: float = 24 * 3600,
+        db_path: Optional[str] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.stats = {
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+        self._db = None
+        self._db_lock = threading.Lock()
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            created_at, value = entry
+            if now - created_at <= self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return value
+            del self._entries[key]
+            self.stats["expirations"] += 1
+
+        if self._db is not None:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+            if row and now - row[1] <= self.ttl_seconds:
+                self._put_memory(key, row[0], row[1])
+                self.stats["disk_hits"] += 1
+                return row[0]
+
+        self.stats["misses"] += 1
+        return None
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        self._put_memory(key, value, now)
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, value, now),
+                )
+                self._db.commit()
+
+    def _put_memory(self, key: str, value: str, created_at: float):
+        self._entries[key] = (created_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def purge_expired(self) -> int:
+        """Drop expired entries from both tiers; returns in-memory count removed."""
+        cutoff = time.time() - self.ttl_seconds
+        expired = [k for k, (created_at, _) in self._entries.items() if created_at < cutoff]
+        for k in expired:
+            del self._entries[k]
+        self.stats["expirations"] += len(expired)
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM llm_cache WHERE created_at < ?", (cutoff,))
+                self._db.commit()
+        return len(expired)
+
+    def clear(self):
+        self._entries.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+    def snapshot(self) -> Dict[str, float]:
+        lookups = self.stats["hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        hits = self.stats["hits"] + self.stats["disk_hits"]
+        return {
+            **self.stats,
+            "size": len(self._entries),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def cache_from_env() -> Optional[LLMCache]:
+    """Build the process cache from LLM_CACHE_* settings (None when disabled)."""
+    if os.getenv("LLM_CACHE_ENABLED", "1") == "0":
+        return None
+    return LLMCache(
+        max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2048")),
+        ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", str(24 * 3600))),
+        db_path=os.getenv("LLM_CACHE_PATH") or None,
+    )
@@ -0,0 +1,112 @@
+"""
+Local fast-path behavior classifier.
+
+Resolves the behaviors that follow fixed rules in BEHAVIOR_CLASSIFIER_PROMPT
+(word-count limits and common confusion phrases) without calling Gemini.
+Anything else returns None and is escalated to the LLM classifier.
+"""
+
+import re
+from typing import Dict, Optional
+
+SHORT_ANSWER_MAX_WORDS = 5      # fewer than this many words → SHORT_ANSWER
+OVERLONG_ANSWER_MIN_WORDS = 120  # more than this many words → OVERLONG_ANSWER
+
+# Phrases that on their own signal the user did not understand the question
+CONFUSED_PHRASES = (
+    "i don't know",
+    "i dont know",
+    "i do not know",
+    "no idea",
+    "not sure",
+    "i'm not sure",
+    "what do you mean",
+    "can you repeat",
+    "could you repeat",
+    "please repeat",
+    "repeat the question",
+    "i don't understand",
+    "i dont understand",
+    "i do not understand",
+    "didn't understand",
+    "didn't get that",
+    "can you explain the question",
+    "pardon",
+)
+
+# Confusion phrases only count for short messages that are essentially just
+# the phrase; "I'm not sure but threads share memory" is a hedged answer
+# and goes to the LLM.
+CONFUSED_MAX_WORDS = 12
+
+# Words that may surround a confusion phrase without adding content
+CONFUSED_FILLER = frozenset(
+    "i i'm im a an the it that this what you me to be really honestly actually sorry um uh hmm "
+    "well so ok okay yeah oh sir please question answer about here at all just mean".split()
+)
+_WORD_RE = re.compile(r"[a-z']+")
+
+_CONFUSED_RE = re.compile(
+    r"\b(?:" + "|".join(re.escape(p) for p in CONFUSED_PHRASES) + r")\b"
+)
+_APOSTROPHES = str.maketrans({"’": "'", "‘": "'"})
+
+
+class FastPathStats:
+    """Counters for how many turns the local classifier resolved."""
+
+    def __init__(self):
+        self.total = 0
+        self.escalated = 0
+        self.hits: Dict[str, int] = {
+            "CONFUSED": 0,
+            "SHORT_ANSWER": 0,
+            "OVERLONG_ANSWER": 0,
+        }
+
+    def record(self, label: Optional[str]):
+        self.total += 1
+        if label is None:
+            self.escalated += 1
+        else:
+            self.hits[label] += 1
+
+    def snapshot(self) -> Dict[str, object]:
+        resolved = self.total - self.escalated
+        return {
+            "total": self.total,
+            "fast_path": resolved,
+            "escalated": self.escalated,
+            "hit_rate": round(resolved / self.total, 4) if self.total else 0.0,
+            "by_label": dict(self.hits),
+        }
+
+
+stats = FastPathStats()
+
+
+def _only_confusion(text: str) -> bool:
+    """True if nothing but filler is left once the confusion phrases are removed."""
+    rest = _CONFUSED_RE.sub(" ", text)
+    return all(word in CONFUSED_FILLER for word in _WORD_RE.findall(rest))
+
+
+def fast_classify(message: str) -> Optional[str]:
+    """
+    Return a behavior label for obvious cases, or None to escalate.
+
+    Labels match the routing branches in InterviewAgent.handle_answer.
+    """
+    text = (message or "").translate(_APOSTROPHES).lower()
+    words = len(text.split())
+
+    label = None
+    if words <= CONFUSED_MAX_WORDS and _CONFUSED_RE.search(text) and _only_confusion(text):
+        label = "CONFUSED"
+    elif words < SHORT_ANSWER_MAX_WORDS:
+        label = "SHORT_ANSWER"
+    elif words > OVERLONG_ANSWER_MIN_WORDS:
+        label = "OVERLONG_ANSWER"
+
+    stats.record(label)
+    return label
@@ -0,0 +1,138 @@
+"""
+Deterministic fake LLM provider for offline load tests and demos.
+
+Selected with LLM_PROVIDER=fake. It mimics the LangChain chat-model
+surface used by llm.py (`ainvoke`/`astream` returning objects with
+`.content` and `usage_metadata`) and answers by prompt kind:
+
+- behavior classification → a canned label (weighted, seeded)
+- per-answer / batched evaluation → valid JSON, or invalid JSON at a
+  configurable rate to exercise the fallback paths
+- anything else (follow-ups) → a short question
+
+Settings (env):
+  FAKE_LLM_LATENCY            fixed:0.3 | uniform:0.1,0.6 | lognormal:-1.2,0.5  (seconds)
+  FAKE_LLM_LABELS             NORMAL:6,SHORT_ANSWER:1,CONFUSED:1,OFF_TOPIC:1,CHATTY:1
+  FAKE_LLM_INVALID_JSON_RATE  0.0 - 1.0
+  FAKE_LLM_SEED               integer
+"""
+
+import os
+import re
+import json
+import zlib
+import random
+import asyncio
+from typing import Dict, List, Tuple
+
+CLASSIFIER_MARKER = "Classify the user's message"
+BATCH_EVAL_MARKER = "return ONLY a valid JSON array"
+EVAL_MARKER = "Return EXACT JSON"
+
+DEFAULT_LABELS = "NORMAL:6,SHORT_ANSWER:1,CONFUSED:1,OFF_TOPIC:1,CHATTY:1"
+
+
+class FakeMessage:
+    def __init__(self, content: str, prompt: str):
+        self.content = content
+        self.usage_metadata = {
+            "input_tokens": max(1, len(prompt) // 4),
+            "output_tokens": max(1, len(content) // 4),
+        }
+
+
+def parse_latency(spec: str):
+    """Return a function rng -> seconds for a latency spec string."""
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(values[0], values[1])
+    raise ValueError(f"Unknown FAKE_LLM_LATENCY: {spec}")
+
+
+def parse_labels(spec: str) -> Tuple[List[str], List[float]]:
+    labels, weights = [], []
+    for item in spec.split(","):
+        label, _, weight = item.partition(":")
+        labels.append(label.strip().upper())
+        weights.append(float(weight or 1))
+    return labels, weights
+
+
+class FakeChatModel:
+    def __init__(
+        self,
+        temperature: float = 0.2,
+        max_output_tokens: int = 600,
+        latency: str = None,
+        labels: str = None,
+        invalid_json_rate: float = None,
+        seed: int = None,
+        response_schema: Dict = None,
+    ):
+        self.temperature = temperature
+        # structured-output mode is not enforced, so invalid JSON still
+        # reaches the caller's validation and repair path
+        self.response_schema = response_schema
+        self.max_output_tokens = max_output_tokens
+        self._latency = parse_latency(latency or os.getenv("FAKE_LLM_LATENCY", "uniform:0.2,0.6"))
+        self._labels, self._weights = parse_labels(labels or os.getenv("FAKE_LLM_LABELS", DEFAULT_LABELS))
+        self.invalid_json_rate = (
+            float(os.getenv("FAKE_LLM_INVALID_JSON_RATE", "0"))
+            if invalid_json_rate is None else invalid_json_rate
+        )
+        self.seed = int(os.getenv("FAKE_LLM_SEED", "7")) if seed is None else seed
+        self._latency_rng = random.Random(self.seed)
+
+    def _rng(self, prompt: str) -> random.Random:
+        # same prompt → same answer, independent of call order
+        return random.Random(self.seed ^ zlib.crc32(prompt.encode("utf-8")))
+
+    def _evaluation(self, rng: random.Random) -> Dict:
+        return {
+            "technical": rng.randint(3, 9),
+            "communication": rng.randint(4, 9),
+            "problem_solving": rng.randint(3, 9),
+            "structure": rng.randint(4, 9),
+            "strengths": rng.sample(["Clear definition", "Good example", "Structured answer", "Correct terminology"], 2),
+            "weaknesses": rng.sample(["Lacks depth", "No trade-offs discussed", "Missing example", "Vague wording"], 2),
+            "suggestions": rng.sample(["Add a concrete example", "Discuss complexity", "Mention edge cases", "Summarize first"], 2),
+        }
+
+    def respond(self, prompt: str) -> str:
+        rng = self._rng(prompt)
+
+        if CLASSIFIER_MARKER in prompt:
+            return rng.choices(self._labels, self._weights)[0]
+
+        if BATCH_EVAL_MARKER in prompt or EVAL_MARKER in prompt:
+            if rng.random() < self.invalid_json_rate:
+                return "Here is my evaluation: the answer is decent but {not valid json"
+            if BATCH_EVAL_MARKER in prompt:
+                ids = [int(i) for i in re.findall(r"\[id (\d+)\]", prompt)]
+                return json.dumps([{"id": i, **self._evaluation(rng)} for i in ids])
+            return json.dumps(self._evaluation(rng))
+
+        return rng.choice([
+            "What trade-offs would you consider in that approach?",
+            "Can you walk me through a concrete example?",
+            "How would that behave under heavy concurrent load?",
+        ])
+
+    async def ainvoke(self, prompt: str) -> FakeMessage:
+        await asyncio.sleep(self._latency(self._latency_rng))
+        return FakeMessage(self.respond(prompt), prompt)
+
+    async def astream(self, prompt: str):
+        delay = self._latency(self._latency_rng)
+        text = self.respond(prompt)
+        tokens = re.findall(r"\s*\S+\s*", text) or [text]
+        # roughly: first token after a third of the latency, the rest spread out
+        await asyncio.sleep(delay / 3)
+        for token in tokens:
+            yield FakeMessage(token, prompt)
+            await asyncio.sleep(2 * delay / 3 / len(tokens))
@@ -1,28 +1,27 @@
 """
 Follow-up Question Generator
 Uses Gemini to generate deep, structured follow-ups.
+
+`stream_followup` writes the follow-up for SHORT_ANSWER turns on
+/chat/stream, where its tokens are shown as they arrive; /chat keeps the
+instant canned follow-up.
 """
 
-import os
-from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
+import time
+from typing import AsyncIterator
+
+from .llm import call_llm, stream_llm
+from .resilience import LLMUnavailableError, LLM_DEGRADED
+from .metrics import STAGE_SECONDS
+from .prompt_builder import compile_prompt, FOLLOWUP_ANSWER_BUDGET
 
-load_dotenv(".env")
 
-GEMINI_KEY = os.getenv("GEMINI_API_KEY")
+async def _call_llm(prompt: str) -> str:
+    return await call_llm(prompt, temperature=0.3, max_output_tokens=200, stage="followup")
 
-_llm = ChatGoogleGenerativeAI(
-    model="models/gemini-2.5-flash",
-    temperature=0.3,
-    max_output_tokens=200,
-    google_api_key=GEMINI_KEY
-)
 
-def _call_llm(prompt: str) -> str:
-    response = _llm.invoke(prompt)
-    if hasattr(response, "content"):
-        return response.content.strip()
-    return str(response).strip()
+def _stream_llm(prompt: str) -> AsyncIterator[str]:
+    return stream_llm(prompt, temperature=0.3, max_output_tokens=200, stage="followup")
 
 
 FOLLOWUP_SYSTEM_PROMPT = """
@@ -40,15 +39,10 @@ Generate a SINGLE follow-up question that:
 Return ONLY the question. No explanations.
 """
 
+# Used when Gemini is unavailable
+FALLBACK_FOLLOWUP = "Can you walk me through a concrete example of that?"
 
-def generate_followup(previous_question: str, user_answer: str, role: str) -> str:
-    """
-    Generate deep follow-up question using Gemini.
-    """
-
-    prompt = f"""
-{FOLLOWUP_SYSTEM_PROMPT}
-
+FOLLOWUP_PROMPT_TEMPLATE = FOLLOWUP_SYSTEM_PROMPT + """
 Role: {role}
 
 Original question:
@@ -60,6 +54,60 @@ User's answer:
 Generate ONE deep follow-up question:
 """
 
-    output = _call_llm(prompt)
-    return output.split("\n")[0]  # return only first line
 
+def _followup_prompt(previous_question: str, user_answer: str, role: str) -> str:
+    return compile_prompt(
+        "followup",
+        FOLLOWUP_PROMPT_TEMPLATE,
+        {"user_answer": FOLLOWUP_ANSWER_BUDGET},
+        role=role,
+        previous_question=previous_question,
+        user_answer=user_answer,
+    )
+
+
+async def generate_followup(previous_question: str, user_answer: str, role: str) -> str:
+    """
+    Generate deep follow-up question using Gemini.
+    """
+    prompt = _followup_prompt(previous_question, user_answer, role)
+
+    start = time.perf_counter()
+    try:
+        output = await _call_llm(prompt)
+    except LLMUnavailableError:
+        LLM_DEGRADED.inc("followup")
+        output = FALLBACK_FOLLOWUP
+    STAGE_SECONDS.since(start, "generate_followup")
+    return output.strip().split("\n")[0] or FALLBACK_FOLLOWUP  # return only first line
+
+
+async def stream_followup(previous_question: str, user_answer: str, role: str) -> AsyncIterator[str]:
+    """
+    Same question as `generate_followup`, yielded as Gemini produces it
+    (stops at the first line break). Falls back to FALLBACK_FOLLOWUP if
+    Gemini is unavailable before any text arrives.
+    """
+    prompt = _followup_prompt(previous_question, user_answer, role)
+
+    start = time.perf_counter()
+    sent = ""
+    stream = _stream_llm(prompt)
+    try:
+        async for chunk in stream:
+            if not sent:
+                chunk = chunk.lstrip()
+            line, newline, _ = chunk.partition("\n")
+            if line:
+                sent += line
+                yield line
+            if newline and sent:
+                break
+    except LLMUnavailableError:
+        LLM_DEGRADED.inc("followup")
+        # text already shown cannot be taken back; end the question there
+    finally:
+        await stream.aclose()
+    if not sent:
+        yield FALLBACK_FOLLOWUP
+    STAGE_SECONDS.since(start, "generate_followup")
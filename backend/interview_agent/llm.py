@@ -0,0 +1,262 @@
+"""
+Shared async gateway for all Gemini calls.
+
+Every module (agent, advanced scoring, follow-ups) goes through `call_llm`
+so that FastAPI handlers can `await` the round-trip instead of blocking the
+event loop.
+
+Clients live in a process-wide registry and are built lazily on first use:
+importing this module does not import LangChain or require GEMINI_API_KEY,
+so the app starts fast and non-LLM endpoints work without them. Each
+generation config gets one long-lived client (and its pooled connection).
+
+Passing `response_schema` to `call_llm` switches the call to structured
+output (JSON mode constrained by the schema); it is part of the client
+config and of the cache key.
+
+Upstream calls first take a slot from the priority scheduler (rate limits,
+priority classes, load shedding), then run under the resilience layer
+(retries, circuit breaker). One per-stage deadline bounds both the queue
+wait and the upstream attempts. Both raise LLMUnavailableError when a call
+cannot be served.
+"""
+
+import os
+import json
+import time
+import asyncio
+import threading
+from typing import Any, Callable, Dict, Tuple, AsyncIterator, Optional, TYPE_CHECKING
+
+from .cache import LLMCache, cache_from_env, make_key
+from .metrics import LLM_REQUEST_SECONDS, LLM_REQUESTS, LLM_PROMPT_CHARS, LLM_RESPONSE_CHARS
+from .resilience import LLMUnavailableError, LLM_FAILURES, breaker, guarded_call, stage_deadline
+from .scheduler import scheduler
+
+if TYPE_CHECKING:
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+MODEL_NAME = "models/gemini-2.5-flash"
+
+# "gemini" (default) or "fake" (deterministic offline provider, see fake_llm.py)
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")
+# identifies the model in cache keys, so fake responses never mix with Gemini ones
+MODEL_ID = MODEL_NAME if LLM_PROVIDER == "gemini" else f"{LLM_PROVIDER}:{MODEL_NAME}"
+
+_clients: Dict[Tuple[str, float, int, str], "ChatGoogleGenerativeAI"] = {}
+_clients_lock = threading.Lock()
+
+# Response cache shared by every call_llm/stream_llm caller (None if disabled)
+cache: Optional[LLMCache] = cache_from_env()
+
+# Process-wide token accounting (reported tokens when available, else estimates)
+_usage = {"requests": 0, "input_tokens": 0, "output_tokens": 0}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English text)."""
+    return max(1, len(text) // 4)
+
+
+def usage_stats() -> Dict[str, int]:
+    return dict(_usage)
+
+
+def reset_usage():
+    for k in _usage:
+        _usage[k] = 0
+
+
+def _record_usage(prompt: str, response, text: str) -> int:
+    """Add one call to the usage totals; returns its total tokens."""
+    meta = getattr(response, "usage_metadata", None) or {}
+    input_tokens = meta.get("input_tokens") or estimate_tokens(prompt)
+    output_tokens = meta.get("output_tokens") or estimate_tokens(text)
+    _usage["requests"] += 1
+    _usage["input_tokens"] += input_tokens
+    _usage["output_tokens"] += output_tokens
+    return input_tokens + output_tokens
+
+
+def _api_key() -> str:
+    key = os.getenv("GEMINI_API_KEY")
+    if not key:
+        raise ValueError("❌ ERROR: GEMINI_API_KEY not found in .env")
+    return key
+
+
+def _schema_key(response_schema: Optional[Dict[str, Any]]) -> str:
+    return json.dumps(response_schema, sort_keys=True) if response_schema else ""
+
+
+def _build_client(temperature: float, max_output_tokens: int, response_schema: Optional[Dict[str, Any]] = None):
+    if LLM_PROVIDER == "fake":
+        from .fake_llm import FakeChatModel
+
+        return FakeChatModel(
+            temperature=temperature,
+            max_output_tokens=max_output_tokens,
+            response_schema=response_schema,
+        )
+
+    if LLM_PROVIDER != "gemini":
+        raise ValueError(f"Unknown LLM_PROVIDER: {LLM_PROVIDER}")
+
+    # heavy import deferred until the first real LLM call
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    structured = {}
+    if response_schema:
+        structured = {"response_mime_type": "application/json", "response_schema": response_schema}
+
+    return ChatGoogleGenerativeAI(
+        model=MODEL_NAME,
+        temperature=temperature,
+        max_output_tokens=max_output_tokens,
+        google_api_key=_api_key(),
+        **structured
+    )
+
+
+def get_client(
+    temperature: float, max_output_tokens: int, response_schema: Optional[Dict[str, Any]] = None
+) -> "ChatGoogleGenerativeAI":
+    """Return the shared client for this generation config (created on first use)."""
+    key = (LLM_PROVIDER, temperature, max_output_tokens, _schema_key(response_schema))
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = _build_client(temperature, max_output_tokens, response_schema)
+    return client
+
+
+def _text(response) -> str:
+    # LangChain returns .content for chat models
+    if hasattr(response, "content"):
+        return response.content
+    return str(response)
+
+
+async def call_llm(
+    prompt: str,
+    temperature: float = 0.2,
+    max_output_tokens: int = 600,
+    use_cache: bool = True,
+    stage: str = "other",
+    response_schema: Optional[Dict[str, Any]] = None,
+    validate: Optional[Callable[[str], bool]] = None,
+) -> str:
+    """
+    Await a full Gemini completion without blocking the event loop.
+    `stage` labels the call in metrics (classify, evaluate, followup, ...).
+    `response_schema` requests structured JSON output in that shape.
+    `validate` keeps responses that fail it out of the cache (they are
+    still returned), so a retry of the same prompt calls Gemini again.
+    """
+    start = time.perf_counter()
+    key = None
+    if use_cache and cache is not None:
+        model = MODEL_ID + (f"|schema:{_schema_key(response_schema)}" if response_schema else "")
+        key = make_key(model, temperature, max_output_tokens, prompt)
+        cached = cache.get(key)
+        if cached is not None and (validate is None or validate(cached)):
+            LLM_REQUESTS.inc(stage, "cache")
+            LLM_REQUEST_SECONDS.since(start, stage)
+            return cached
+
+    client = get_client(temperature, max_output_tokens, response_schema)
+    # one budget for the whole call: queue wait plus upstream attempts
+    deadline = time.monotonic() + stage_deadline(stage)
+    async with scheduler.slot(stage, estimate_tokens(prompt) + max_output_tokens, deadline) as ticket:
+        response = await guarded_call(stage, lambda: client.ainvoke(prompt), deadline)
+        text = _text(response)
+        ticket.settle(_record_usage(prompt, response, text))
+    text = text.strip()
+
+    LLM_REQUESTS.inc(stage, "llm")
+    LLM_PROMPT_CHARS.inc(stage, amount=len(prompt))
+    LLM_RESPONSE_CHARS.inc(stage, amount=len(text))
+    LLM_REQUEST_SECONDS.since(start, stage)
+
+    if key is not None and (validate is None or validate(text)):
+        cache.set(key, text)
+    return text
+
+
+async def stream_llm(
+    prompt: str,
+    temperature: float = 0.2,
+    max_output_tokens: int = 600,
+    use_cache: bool = True,
+    stage: str = "other",
+) -> AsyncIterator[str]:
+    """
+    Yield Gemini output chunks as they arrive (a cache hit is one chunk).
+    The stage deadline bounds the whole stream and the breaker applies;
+    there are no retries, since chunks already yielded cannot be taken back.
+    """
+    start = time.perf_counter()
+    key = None
+    if use_cache and cache is not None:
+        key = make_key(MODEL_ID, temperature, max_output_tokens, prompt)
+        cached = cache.get(key)
+        if cached is not None:
+            LLM_REQUESTS.inc(stage, "cache")
+            LLM_REQUEST_SECONDS.since(start, stage)
+            yield cached
+            return
+
+    client = get_client(temperature, max_output_tokens)
+    # one budget for the queue wait, the first chunk and the whole stream
+    deadline = time.monotonic() + stage_deadline(stage)
+    parts = []
+    completed = False
+    async with scheduler.slot(stage, estimate_tokens(prompt) + max_output_tokens, deadline) as ticket:
+        # checked once the slot is held, so a shed call never takes the
+        # breaker's half-open probe
+        if not breaker.allow():
+            LLM_FAILURES.inc(stage, "breaker_open")
+            raise LLMUnavailableError("LLM circuit breaker is open")
+        upstream = client.astream(prompt)
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                try:
+                    chunk = await asyncio.wait_for(upstream.__anext__(), remaining)
+                except StopAsyncIteration:
+                    break
+                text = _text(chunk)
+                if text:
+                    if not parts:
+                        breaker.record_success()  # upstream is answering
+                    parts.append(text)
+                    yield text
+            completed = True
+        except (asyncio.CancelledError, GeneratorExit):
+            # closed early by the consumer: says nothing about upstream
+            if not parts:
+                breaker.release_probe()
+            raise
+        except Exception as exc:
+            breaker.record_failure()
+            reason = "deadline" if isinstance(exc, asyncio.TimeoutError) else "error"
+            LLM_FAILURES.inc(stage, reason)
+            raise LLMUnavailableError(f"{stage} LLM stream failed: {type(exc).__name__}: {exc}") from exc
+        finally:
+            await upstream.aclose()
+            full = "".join(parts)
+            if parts:
+                # billed even when the consumer stopped early
+                ticket.settle(_record_usage(prompt, None, full))
+                LLM_REQUESTS.inc(stage, "llm")
+                LLM_PROMPT_CHARS.inc(stage, amount=len(prompt))
+                LLM_RESPONSE_CHARS.inc(stage, amount=len(full))
+                LLM_REQUEST_SECONDS.since(start, stage)
+
+    # only complete responses are cached
+    if completed and key is not None:
+        cache.set(key, full.strip())
@@ -0,0 +1,40 @@
+"""
+Per-session async locks.
+
+Turns within one session run one at a time; different sessions never wait
+on each other. A lock exists only while some turn holds or waits for it, so
+the table stays bounded by the number of sessions with a turn in flight.
+Locks are per process. With the SQLite store and several workers, the
+store is what keeps a session consistent: each answer is recorded (and its
+index assigned) in one transaction, and the next question is picked under
+the database write lock. Turns of one session handled by two workers at
+once are both recorded, but their replies are not ordered with each other;
+route a session's requests to one worker if that ordering matters.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, List
+
+
+class SessionLocks:
+    def __init__(self):
+        # session_id -> [lock, number of holders + waiters]
+        self._locks: Dict[str, List] = {}
+
+    @asynccontextmanager
+    async def hold(self, session_id: str):
+        entry = self._locks.get(session_id)
+        if entry is None:
+            entry = self._locks[session_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[session_id]
+
+    def __len__(self) -> int:
+        return len(self._locks)
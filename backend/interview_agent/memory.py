@@ -1,47 +1,132 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Callable
+import asyncio
+import os
 import time
 
+from .store import SessionStore, InMemorySessionStore, QuestionPicker
+
+# Limits for live sessions (0 disables the limit)
+SESSION_MAX = int(os.getenv("SESSION_MAX", "10000"))
+SESSION_IDLE_TTL_SECONDS = float(os.getenv("SESSION_IDLE_TTL_SECONDS", "3600"))
+SESSION_SWEEP_INTERVAL_SECONDS = float(os.getenv("SESSION_SWEEP_INTERVAL_SECONDS", "60"))
+
 class SessionMemory:
-    def __init__(self):
-        self.sessions: Dict[str, Dict[str, Any]] = {}
+    """
+    Session API used by the agent, bounded by a max session count (LRU
+    eviction) and an idle TTL (sessions untouched for longer are expired).
+    Storage is delegated to a SessionStore (in-process dict by default);
+    calls into a blocking store (SQLite) run in a worker thread so disk I/O
+    never stalls the event loop.
+    """
+
+    def __init__(
+        self,
+        store: Optional[SessionStore] = None,
+        max_sessions: Optional[int] = None,
+        idle_ttl: Optional[float] = None,
+    ):
+        self.store = store or InMemorySessionStore()
+        self.max_sessions = SESSION_MAX if max_sessions is None else max_sessions
+        self.idle_ttl = SESSION_IDLE_TTL_SECONDS if idle_ttl is None else idle_ttl
+        self.stats = {"created": 0, "ended": 0, "evicted_lru": 0, "expired_ttl": 0}
+
+    async def _call(self, fn: Callable, *args):
+        if self.store.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def create_session(self, session_id: str, role: str):
+        await self._call(self.store.create, session_id, role, time.time())
+        self.stats["created"] += 1
+
+        if self.max_sessions:
+            self.stats["evicted_lru"] += await self._call(self.store.evict_lru, self.max_sessions)
+
+    async def get(self, session_id: str):
+        session = await self._call(self.store.get, session_id)
+        if session is None:
+            return None
+        if not await self._keep_alive(session_id, session["last_access"]):
+            return None
+        return session
+
+    async def _keep_alive(self, session_id: str, last_access: float) -> bool:
+        """Expire the session if idle too long, else touch it."""
+        now = time.time()
+        if self.idle_ttl and now - last_access > self.idle_ttl:
+            await self._call(self.store.delete, session_id)
+            self.stats["expired_ttl"] += 1
+            return False
+
+        await self._call(self.store.touch, session_id, now)
+        return True
+
+    async def record_answer(self, session_id: str, answer: str) -> Optional[Dict[str, Any]]:
+        """
+        Append an answer and count the turn in one store transaction.
+        Returns {"index", "question", "last_question", "role"}, or None if
+        the session does not exist or expired.
+        """
+        last_access = await self._call(self.store.last_access, session_id)
+        if last_access is None or not await self._keep_alive(session_id, last_access):
+            return None
+        return await self._call(self.store.record_answer, session_id, answer)
+
+    async def advance_question(self, session_id: str, key: str, pick: QuestionPicker):
+        """Pick and append the next question, updating metadata[key] atomically."""
+        return await self._call(self.store.advance_question, session_id, key, pick)
+
+    async def get_evaluation(self, session_id: str, index: int) -> Optional[dict]:
+        """Stored evaluation entry for one answer (no full-session read, no touch)."""
+        return await self._call(self.store.get_evaluation, session_id, index)
+
+    async def sweep(self) -> int:
+        """Drop every idle-expired session; returns how many were removed."""
+        if not self.idle_ttl:
+            return 0
+        removed = await self._call(self.store.delete_idle, time.time() - self.idle_ttl)
+        self.stats["expired_ttl"] += removed
+        return removed
+
+    async def run_sweeper(self, interval: float = SESSION_SWEEP_INTERVAL_SECONDS):
+        """Background task: periodically expire idle sessions."""
+        while True:
+            await asyncio.sleep(interval)
+            await self.sweep()
 
-    def create_session(self, session_id: str, role: str):
-        self.sessions[session_id] = {
-            "role": role,
-            "questions_asked": [],
-            "answers": [],
-            "created_at": time.time(),
-            "turn_count": 0,
-            "confusion_count": 0,
-            "off_topic_count": 0,
-            "last_question": None,
-            "metadata": {}
-        }
+    def snapshot(self) -> Dict[str, int]:
+        return {**self.stats, "active": self.store.count()}
 
-    def get(self, session_id: str):
-        return self.sessions.get(session_id)
+    async def increment_turn(self, session_id: str):
+        await self._call(self.store.increment, session_id, "turn_count")
 
-    def increment_turn(self, session_id: str):
-        self.sessions[session_id]["turn_count"] += 1
+    async def increment_confusion(self, session_id: str):
+        await self._call(self.store.increment, session_id, "confusion_count")
 
-    def increment_confusion(self, session_id: str):
-        self.sessions[session_id]["confusion_count"] += 1
+    async def increment_off_topic(self, session_id: str):
+        await self._call(self.store.increment, session_id, "off_topic_count")
 
-    def increment_off_topic(self, session_id: str):
-        self.sessions[session_id]["off_topic_count"] += 1
+    async def set_last_question(self, session_id: str, question: str):
+        await self._call(self.store.set_last_question, session_id, question)
 
-    def set_last_question(self, session_id: str, question: str):
-        self.sessions[session_id]["last_question"] = question
+    async def append_question(self, session_id: str, question: str, metadata: dict):
+        await self._call(self.store.append_question, session_id, question, metadata)
 
-    def append_question(self, session_id: str, question: str, metadata: dict):
-        self.sessions[session_id]["questions_asked"].append(
-            {"q": question, "metadata": metadata}
-        )
-        self.set_last_question(session_id, question)
+    async def append_answer(self, session_id: str, answer: str):
+        await self._call(self.store.append_answer, session_id, answer)
 
-    def append_answer(self, session_id: str, answer: str):
-        self.sessions[session_id]["answers"].append(answer)
+    async def set_evaluation(self, session_id: str, index: int, question: str, answer: str, result: dict):
+        await self._call(self.store.set_evaluation, session_id, index, {
+            "question": question,
+            "answer": answer,
+            "result": result
+        })
 
-    def end_session(self, session_id: str):
-        return self.sessions.pop(session_id, None)
+    async def set_metadata(self, session_id: str, key: str, value: Any):
+        await self._call(self.store.set_metadata, session_id, key, value)
 
+    async def end_session(self, session_id: str):
+        session = await self._call(self.store.delete, session_id)
+        if session is not None:
+            self.stats["ended"] += 1
+        return session
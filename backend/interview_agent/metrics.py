@@ -0,0 +1,170 @@
+"""
+Minimal in-process metrics with Prometheus text exposition.
+
+Counters and histograms are plain dict/list updates (no locks, no
+allocation per observation once a label set exists), so recording on the
+hot path costs well under a microsecond. Callback metrics are read only
+when /metrics is scraped.
+"""
+
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Tuple, Union
+
+# Latency buckets in seconds (fast local paths up to slow LLM round-trips)
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+_registry: List["_Metric"] = []
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        _registry.append(self)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_labels(self.labelnames, labels)} {value}"
+            for labels, value in self._values.items()
+        ]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def since(self, start: float, *labels: str):
+        """Observe the time elapsed since a time.perf_counter() start."""
+        self.observe(time.perf_counter() - start, *labels)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for labels, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """Gauge/counter whose value(s) are read from a function at scrape time."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        fn: Callable[[], Union[float, Dict[str, float]]],
+        type: str = "gauge",
+        labelname: str = "",
+    ):
+        super().__init__(name, help, (labelname,) if labelname else ())
+        self.type = type
+        self.fn = fn
+
+    def _samples(self) -> List[str]:
+        value = self.fn()
+        if isinstance(value, dict):
+            return [f"{self.name}{_labels(self.labelnames, (k,))} {v}" for k, v in value.items()]
+        return [f"{self.name} {value}"]
+
+
+def render() -> str:
+    """All registered metrics in Prometheus text format (version 0.0.4)."""
+    lines: List[str] = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ----------------------------------------------------------
+# Shared metrics
+# ----------------------------------------------------------
+STAGE_SECONDS = Histogram(
+    "interview_stage_seconds",
+    "Latency of interview pipeline stages.",
+    ("stage",),
+)
+LLM_REQUEST_SECONDS = Histogram(
+    "llm_request_seconds",
+    "Latency of LLM gateway calls (cache hits included).",
+    ("stage",),
+)
+LLM_REQUESTS = Counter(
+    "llm_requests_total",
+    "LLM gateway calls by stage and source (llm or cache).",
+    ("stage", "source"),
+)
+LLM_PROMPT_CHARS = Counter(
+    "llm_prompt_chars_total",
+    "Characters sent to the LLM.",
+    ("stage",),
+)
+LLM_RESPONSE_CHARS = Counter(
+    "llm_response_chars_total",
+    "Characters received from the LLM.",
+    ("stage",),
+)
+EVAL_PARSE_FALLBACKS = Counter(
+    "evaluation_parse_fallbacks_total",
+    "Evaluations that needed a fallback parse (brace_slice), a repair call (repaired) or heuristic scores.",
+    ("kind",),
+)
+EVAL_PARSE_FAILURES = Counter(
+    "evaluation_parse_failures_total",
+    "Evaluation responses that failed schema validation.",
+    ("stage",),
+)
+EVAL_WASTED_TOKENS = Counter(
+    "evaluation_wasted_tokens_total",
+    "Estimated prompt + response tokens of evaluation calls whose output was discarded.",
+    ("stage",),
+)
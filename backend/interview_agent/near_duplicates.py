@@ -0,0 +1,174 @@
+"""
+Near-duplicate answer index for reusing evaluations.
+
+Many candidates give nearly the same textbook answer to a bank question.
+Each evaluated answer is reduced to a MinHash signature over word 3-gram
+shingles and filed per question in LSH band buckets; a new answer whose
+estimated Jaccard similarity to a stored one reaches the threshold reuses
+that evaluation instead of calling the LLM.
+
+The index is a bounded LRU (NEAR_DUP_MAX_ENTRIES signatures across all
+questions) and can be saved to / loaded from a JSONL file (NEAR_DUP_PATH).
+
+Settings (env):
+  NEAR_DUP_ENABLED      1 | 0
+  NEAR_DUP_THRESHOLD    minimum estimated Jaccard similarity (0.85)
+  NEAR_DUP_MIN_WORDS    shorter answers are never matched (8)
+  NEAR_DUP_MAX_ENTRIES  stored evaluations (10000)
+  NEAR_DUP_PATH         JSONL file to load at startup and save at shutdown
+"""
+
+import os
+import re
+import json
+import zlib
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+NUM_PERM = 64
+BANDS = 16  # 16 bands x 4 rows: candidates from ~0.5 similarity upwards
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+_PRIME = np.uint64((1 << 61) - 1)
+
+_rng = np.random.RandomState(1234)  # fixed, so persisted signatures stay comparable
+_A = _rng.randint(1, 1 << 31, size=NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, 1 << 31, size=NUM_PERM).astype(np.uint64)
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def signature(text: str) -> Optional[np.ndarray]:
+    """MinHash signature of the answer's word shingles (None if it has no words)."""
+    words = WORD_RE.findall(text.lower())
+    if not words:
+        return None
+    size = min(SHINGLE_SIZE, len(words))
+    shingles = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+    return ((_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME).min(axis=1)
+
+
+def _question_key(role: str, question: str) -> str:
+    return hashlib.sha1(f"{role}\n{question}".encode("utf-8")).hexdigest()[:16]
+
+
+def _bands(qkey: str, sig: np.ndarray) -> List[Tuple[str, int, bytes]]:
+    return [(qkey, b, sig[b * ROWS:(b + 1) * ROWS].tobytes()) for b in range(BANDS)]
+
+
+class NearDuplicateIndex:
+    def __init__(self, threshold: float = 0.85, min_words: int = 8, max_entries: int = 10000):
+        self.threshold = threshold
+        self.min_words = min_words
+        self.max_entries = max_entries
+        # entry id -> (question key, signature, evaluation)
+        self._entries: "OrderedDict[int, Tuple[str, np.ndarray, Dict[str, Any]]]" = OrderedDict()
+        self._buckets: Dict[Tuple[str, int, bytes], set] = {}
+        self._next_id = 0
+        self.stats = {"lookups": 0, "hits": 0, "inserts": 0, "evictions": 0}
+
+    def _eligible(self, answer: str) -> bool:
+        return len((answer or "").split()) >= self.min_words
+
+    def lookup(self, role: str, question: str, answer: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Stored (evaluation, similarity) of the closest near-duplicate answer, if any."""
+        if not self._eligible(answer):
+            return None
+        sig = signature(answer)
+        if sig is None:
+            return None
+        self.stats["lookups"] += 1
+
+        qkey = _question_key(role, question)
+        candidates = set()
+        for band in _bands(qkey, sig):
+            candidates.update(self._buckets.get(band, ()))
+
+        best, best_sim = None, 0.0
+        for entry_id in candidates:
+            other = self._entries[entry_id][1]
+            sim = float(np.count_nonzero(other == sig)) / NUM_PERM
+            if sim > best_sim:
+                best, best_sim = entry_id, sim
+        if best is None or best_sim < self.threshold:
+            return None
+
+        self._entries.move_to_end(best)
+        self.stats["hits"] += 1
+        return self._entries[best][2], best_sim
+
+    def add(self, role: str, question: str, answer: str, evaluation: Dict[str, Any]):
+        if not self._eligible(answer):
+            return
+        sig = signature(answer)
+        if sig is not None:
+            self._insert(_question_key(role, question), sig, evaluation)
+
+    def _insert(self, qkey: str, sig: np.ndarray, evaluation: Dict[str, Any]):
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (qkey, sig, evaluation)
+        for band in _bands(qkey, sig):
+            self._buckets.setdefault(band, set()).add(entry_id)
+        self.stats["inserts"] += 1
+
+        while len(self._entries) > self.max_entries:
+            old_id, (old_qkey, old_sig, _) = self._entries.popitem(last=False)
+            for band in _bands(old_qkey, old_sig):
+                bucket = self._buckets.get(band)
+                if bucket is not None:
+                    bucket.discard(old_id)
+                    if not bucket:
+                        del self._buckets[band]
+            self.stats["evictions"] += 1
+
+    # ----------------------------------------------------------
+    # Persistence (JSONL: question key, signature, evaluation)
+    # ----------------------------------------------------------
+    def save(self, path: str):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for qkey, sig, evaluation in self._entries.values():
+                f.write(json.dumps({"q": qkey, "sig": sig.tolist(), "evaluation": evaluation}) + "\n")
+        os.replace(tmp, path)
+
+    def load(self, path: str) -> int:
+        """Add entries saved by `save`; returns how many were loaded."""
+        if not os.path.exists(path):
+            return 0
+        loaded = 0
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                    sig = np.array(row["sig"], dtype=np.uint64)
+                except (ValueError, KeyError):
+                    continue
+                if sig.shape == (NUM_PERM,):
+                    self._insert(row["q"], sig, row["evaluation"])
+                    loaded += 1
+        return loaded
+
+    def snapshot(self) -> Dict[str, float]:
+        lookups = self.stats["lookups"]
+        return {
+            **self.stats,
+            "saved_calls": self.stats["hits"],
+            "size": len(self._entries),
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+def index_from_env() -> Optional[NearDuplicateIndex]:
+    """Build the process index from NEAR_DUP_* settings (None when disabled)."""
+    if os.getenv("NEAR_DUP_ENABLED", "1") == "0":
+        return None
+    return NearDuplicateIndex(
+        threshold=float(os.getenv("NEAR_DUP_THRESHOLD", "0.85")),
+        min_words=int(os.getenv("NEAR_DUP_MIN_WORDS", "8")),
+        max_entries=int(os.getenv("NEAR_DUP_MAX_ENTRIES", "10000")),
+    )
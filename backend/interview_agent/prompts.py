@@ -29,6 +29,8 @@ Output MUST follow this JSON structure:
 The JSON must always be valid and parseable.
 """
 
+# Seed questions. The interview flow reads the tagged, indexed bank in
+# data/question_bank.jsonl (see question_bank.py), which includes these.
 QUESTION_TEMPLATES = {
     "software_engineer": [
         "Explain the difference between a process and a thread.",
@@ -62,3 +64,12 @@ Classify the user's message into EXACTLY one of these categories:
 Return ONLY the category name. Nothing else.
 """
 
+
+# Minimal classifier prompt: the model only returns a label, so it does not
+# need the interviewer persona or the JSON output spec from SYSTEM_PROMPT.
+CLASSIFIER_PROMPT_TEMPLATE = """
+You label candidate messages in a mock interview.
+
+User message:
+{answer}
+""" + BEHAVIOR_CLASSIFIER_PROMPT
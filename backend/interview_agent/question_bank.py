@@ -0,0 +1,202 @@
+"""
+Indexed question bank.
+
+Questions live in a JSONL data file (one object per line with id, role,
+topic, difficulty, text and an optional scoring rubric). The file is memory-mapped on first use: only
+per-role and per-(role, topic, difficulty) id indexes plus byte offsets are
+kept in Python; question text is decoded from the mapping on demand, so
+worker processes share the file pages through the OS page cache.
+
+Each session keeps a small selection state (a cursor per index and a
+bitmap of used ids), which makes picking the next question O(1) regardless
+of bank size.
+"""
+
+import os
+import json
+import mmap
+import threading
+from array import array
+from typing import Dict, Any, Optional, Tuple, NamedTuple
+
+QUESTION_BANK_PATH = os.getenv(
+    "QUESTION_BANK_PATH",
+    os.path.join(os.path.dirname(__file__), "data", "question_bank.jsonl"),
+)
+DEFAULT_ROLE = "software_engineer"
+
+
+class RubricConcept(NamedTuple):
+    concept: str
+    terms: Tuple[str, ...]
+    weight: float
+
+
+class Question(NamedTuple):
+    id: int
+    role: str
+    topic: str
+    difficulty: str
+    text: str
+    # concepts a good answer covers (used by the local scorer)
+    rubric: Tuple[RubricConcept, ...] = ()
+
+
+class QuestionBank:
+    def __init__(self, path: str = QUESTION_BANK_PATH):
+        self.path = path
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        # decoded questions by id (bounded by the bank size)
+        self._questions: Dict[int, Question] = {}
+
+    def _load(self):
+        with self._load_lock:
+            if self._loaded:
+                return
+            with open(self.path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+            self._offsets: Dict[int, Tuple[int, int]] = {}
+            by_role: Dict[str, array] = {}
+            by_key: Dict[Tuple[str, str, str], array] = {}
+            # hash(question text) -> id, for callers that only have the text
+            by_text: Dict[int, int] = {}
+
+            pos = 0
+            size = len(self._mmap)
+            while pos < size:
+                end = self._mmap.find(b"\n", pos)
+                if end == -1:
+                    end = size
+                line = self._mmap[pos:end].strip()
+                if line:
+                    row = json.loads(line)
+                    qid = int(row["id"])
+                    if qid in self._offsets:
+                        raise ValueError(f"Duplicate question id {qid} in {self.path}")
+                    self._offsets[qid] = (pos, end)
+                    by_role.setdefault(row["role"], array("i")).append(qid)
+                    key = (row["role"], row.get("topic"), row.get("difficulty"))
+                    by_key.setdefault(key, array("i")).append(qid)
+                    by_text.setdefault(hash(row["text"]), qid)
+                pos = end + 1
+
+            self._by_role = by_role
+            self._by_key = by_key
+            self._by_text = by_text
+            self._merged: Dict[Tuple[str, Optional[str], Optional[str]], array] = {}
+            self._loaded = True
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self._load()
+
+    def get(self, qid: int) -> Question:
+        question = self._questions.get(qid)
+        if question is not None:
+            return question
+        self._ensure_loaded()
+        start, end = self._offsets[qid]
+        row = json.loads(self._mmap[start:end])
+        rubric = tuple(
+            RubricConcept(c["concept"], tuple(c["terms"]), float(c.get("weight", 1)))
+            for c in row.get("rubric", ())
+        )
+        question = self._questions[qid] = Question(
+            qid, row["role"], row.get("topic"), row.get("difficulty"), row["text"], rubric
+        )
+        return question
+
+    def find(self, text: str) -> Optional[Question]:
+        """The bank question with exactly this text, if any."""
+        self._ensure_loaded()
+        qid = self._by_text.get(hash(text))
+        if qid is None:
+            return None
+        question = self.get(qid)
+        return question if question.text == text else None
+
+    def resolve_role(self, role: str) -> str:
+        """Roles without questions fall back to the default role."""
+        self._ensure_loaded()
+        return role if role in self._by_role else DEFAULT_ROLE
+
+    def roles(self):
+        self._ensure_loaded()
+        return list(self._by_role)
+
+    def ids(self, role: str, topic: Optional[str] = None, difficulty: Optional[str] = None) -> array:
+        """Question ids for a role, optionally narrowed by topic and difficulty."""
+        self._ensure_loaded()
+        role = self.resolve_role(role)
+        if topic is None and difficulty is None:
+            return self._by_role[role]
+        if topic is not None and difficulty is not None:
+            return self._by_key.get((role, topic, difficulty), array("i"))
+        # single-attribute filter: merge the matching indexes once, then reuse
+        key = (role, topic, difficulty)
+        merged = self._merged.get(key)
+        if merged is None:
+            ids = array("i")
+            for (r, t, d), key_ids in self._by_key.items():
+                if r == role and (topic is None or t == topic) and (difficulty is None or d == difficulty):
+                    ids.extend(key_ids)
+            merged = self._merged[key] = array("i", sorted(ids))
+        return merged
+
+    def next_question(
+        self,
+        role: str,
+        state: Dict[str, Any],
+        topic: Optional[str] = None,
+        difficulty: Optional[str] = None,
+    ) -> Optional[Question]:
+        """
+        Pick the next unused question and update the session `state` in place.
+
+        state = {"cursors": {index key: position}, "used": bitmap of ids}
+        `used` is a bytearray (bit i of byte i // 8 set once id i is asked),
+        updated in place; a hex string (as read back from JSON storage) is
+        decoded first. Returns None when the matching questions are exhausted.
+        """
+        ids = self.ids(role, topic, difficulty)
+        key = f"{self.resolve_role(role)}|{topic or '*'}|{difficulty or '*'}"
+        cursors = state.setdefault("cursors", {})
+        used = state.get("used")
+        if not isinstance(used, bytearray):
+            used = state["used"] = _decode_bitmap(used)
+
+        pos = cursors.get(key, 0)
+        # skip ids already used through another index (amortized O(1))
+        while pos < len(ids) and _is_set(used, ids[pos]):
+            pos += 1
+        if pos >= len(ids):
+            cursors[key] = pos
+            return None
+
+        qid = ids[pos]
+        cursors[key] = pos + 1
+        byte = qid >> 3
+        if byte >= len(used):
+            used.extend(bytes(byte + 1 - len(used)))
+        used[byte] |= 1 << (qid & 7)
+        return self.get(qid)
+
+
+def _is_set(bitmap: bytearray, qid: int) -> bool:
+    byte = qid >> 3
+    return byte < len(bitmap) and bool(bitmap[byte] >> (qid & 7) & 1)
+
+
+def _decode_bitmap(value: Optional[str]) -> bytearray:
+    """Bitmap from its stored hex form; "0x…" is the older big-int encoding."""
+    if not value:
+        return bytearray()
+    if value.startswith("0x"):
+        bits = int(value, 16)
+        return bytearray(bits.to_bytes((bits.bit_length() + 7) // 8, "little"))
+    return bytearray.fromhex(value)
+
+
+bank = QuestionBank()
@@ -0,0 +1,191 @@
+"""
+Resilience layer for upstream LLM calls.
+
+- Per-stage deadlines: the whole call, retries included, must finish within
+  the stage's budget (LLM_DEADLINE_<STAGE> seconds).
+- Retries: transient errors (timeouts, connection resets, 429/5xx) are
+  retried with jittered exponential backoff while the deadline allows.
+- Circuit breaker: after LLM_BREAKER_FAILURES consecutive failed calls the
+  breaker opens and calls fail fast for LLM_BREAKER_RESET_SECONDS; then one
+  probe call is let through and its outcome closes or re-opens it.
+
+Callers get `LLMUnavailableError` when a call cannot be served, and degrade
+to local behavior (rule classifier, heuristic scores, canned follow-ups).
+"""
+
+import os
+import time
+import random
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .metrics import Counter
+
+# Seconds per stage for a whole call including retries
+DEFAULT_DEADLINES = {
+    "classify": 4.0,
+    "followup": 5.0,
+    "evaluate": 20.0,
+    "evaluate_repair": 8.0,
+    "evaluate_batch": 40.0,
+}
+DEFAULT_DEADLINE = float(os.getenv("LLM_DEADLINE_DEFAULT", "15"))
+
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", "0.25"))
+LLM_RETRY_MAX_SECONDS = float(os.getenv("LLM_RETRY_MAX_SECONDS", "2"))
+
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+
+# HTTP statuses worth retrying
+TRANSIENT_STATUS = {408, 429, 500, 502, 503, 504}
+# google.api_core / httpx exception names that mean "try again"
+TRANSIENT_NAMES = {
+    "ResourceExhausted", "ServiceUnavailable", "DeadlineExceeded", "InternalServerError",
+    "TooManyRequests", "GatewayTimeout", "BadGateway", "Aborted",
+    "ConnectError", "ReadTimeout", "WriteTimeout", "PoolTimeout", "RemoteProtocolError",
+}
+
+LLM_RETRIES = Counter("llm_retries_total", "LLM call attempts retried after a transient error.", ("stage",))
+LLM_FAILURES = Counter(
+    "llm_failures_total",
+    "LLM calls that could not be served (deadline, error, breaker_open).",
+    ("stage", "reason"),
+)
+LLM_DEGRADED = Counter(
+    "llm_degraded_total",
+    "Pipeline steps served by local fallbacks because the LLM was unavailable.",
+    ("stage",),
+)
+
+
+class LLMUnavailableError(Exception):
+    """The LLM call failed, timed out, or was short-circuited by the breaker."""
+
+
+def stage_deadline(stage: str) -> float:
+    default = DEFAULT_DEADLINES.get(stage, DEFAULT_DEADLINE)
+    return float(os.getenv(f"LLM_DEADLINE_{stage.upper()}", default))
+
+
+def is_transient(exc: BaseException) -> bool:
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    status = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+    if isinstance(status, int) and status in TRANSIENT_STATUS:
+        return True
+    return type(exc).__name__ in TRANSIENT_NAMES
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = LLM_BREAKER_FAILURES, reset_timeout: float = LLM_BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._stats = {"opened": 0, "short_circuited": 0}
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now (half-open lets one probe through)."""
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = "half_open"
+        if self.state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        self._stats["short_circuited"] += 1
+        return False
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def release_probe(self):
+        """A cancelled call tells nothing about upstream: let another call probe."""
+        if self.state == "half_open":
+            self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                self._stats["opened"] += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "open": int(self.state == "open"),
+            "half_open": int(self.state == "half_open"),
+            "consecutive_failures": self.failures,
+            **self._stats,
+        }
+
+
+# One breaker per process: every stage talks to the same upstream
+breaker = CircuitBreaker()
+
+
+async def guarded_call(stage: str, fn: Callable[[], Awaitable[Any]], deadline: Optional[float] = None) -> Any:
+    """
+    Run `fn()` (one upstream attempt) until `deadline` (time.monotonic(),
+    by default the stage deadline from now), retrying transient errors with
+    full-jitter exponential backoff.
+    Raises LLMUnavailableError if the call cannot be served.
+    """
+    if deadline is None:
+        deadline = time.monotonic() + stage_deadline(stage)
+    if deadline <= time.monotonic():
+        # budget spent before the call started (e.g. queued): not upstream's fault
+        LLM_FAILURES.inc(stage, "deadline")
+        raise LLMUnavailableError(f"{stage} LLM call has no time left")
+    if not breaker.allow():
+        LLM_FAILURES.inc(stage, "breaker_open")
+        raise LLMUnavailableError("LLM circuit breaker is open")
+
+    # a call left with under half its stage budget after queueing timing out
+    # is congestion here, not evidence that upstream is down
+    short_budget = deadline - time.monotonic() < stage_deadline(stage) / 2
+    try:
+        return await _attempts(stage, fn, deadline, short_budget)
+    except asyncio.CancelledError:
+        # cancelled mid-attempt or during backoff: says nothing about
+        # upstream, but must not keep the half-open probe
+        breaker.release_probe()
+        raise
+
+
+async def _attempts(stage: str, fn: Callable[[], Awaitable[Any]], deadline: float, short_budget: bool) -> Any:
+    attempt = 0
+    while True:
+        remaining = deadline - time.monotonic()
+        try:
+            if remaining <= 0:
+                raise asyncio.TimeoutError()
+            result = await asyncio.wait_for(fn(), remaining)
+        except Exception as exc:
+            transient = is_transient(exc)
+            delay = random.uniform(0, min(LLM_RETRY_MAX_SECONDS, LLM_RETRY_BASE_SECONDS * 2 ** attempt))
+            if transient and attempt < LLM_MAX_RETRIES and time.monotonic() + delay < deadline:
+                attempt += 1
+                LLM_RETRIES.inc(stage)
+                await asyncio.sleep(delay)
+                continue
+
+            timed_out = isinstance(exc, asyncio.TimeoutError)
+            if timed_out and short_budget:
+                breaker.release_probe()
+            else:
+                breaker.record_failure()
+            reason = "deadline" if timed_out else "error"
+            LLM_FAILURES.inc(stage, reason)
+            raise LLMUnavailableError(f"{stage} LLM call failed: {type(exc).__name__}: {exc}") from exc
+        else:
+            breaker.record_success()
+            return result
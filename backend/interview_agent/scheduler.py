@@ -0,0 +1,268 @@
+"""
+Priority-aware scheduler in front of the LLM clients.
+
+Every upstream call takes a slot from the process-wide `scheduler` before it
+goes out. A slot needs:
+- one request from the requests-per-minute bucket (LLM_RPM, 0 = unlimited)
+- its estimated tokens from the tokens-per-minute bucket (LLM_TPM, 0 = unlimited);
+  the reservation is settled against the reported usage afterwards
+- a free in-flight slot (LLM_MAX_IN_FLIGHT)
+
+Calls are served by priority class: live turn > follow-up > report
+evaluation > offline batch. Lower classes must leave some headroom in every
+bucket, so a burst of reports never takes the capacity live turns need.
+Each class has a bounded queue; a full queue, or a wait longer than the
+stage deadline, sheds the call with SchedulerOverloadedError (an
+LLMUnavailableError, so callers degrade the same way as during an outage).
+"""
+
+import os
+import time
+import asyncio
+import contextvars
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Deque, Dict, List, Optional
+
+from .metrics import Counter, Histogram
+from .resilience import LLMUnavailableError, stage_deadline
+
+LIVE, FOLLOWUP, REPORT, BATCH = range(4)
+PRIORITY_NAMES = ("live", "followup", "report", "batch")
+
+STAGE_PRIORITY = {
+    "classify": LIVE,
+    "followup": FOLLOWUP,
+    "evaluate": REPORT,
+    "evaluate_repair": REPORT,
+    "evaluate_batch": REPORT,
+}
+
+# Fraction of each bucket (and of the in-flight slots) a class must leave free
+HEADROOM = (0.0, 0.05, 0.2, 0.4)
+
+LLM_RPM = int(os.getenv("LLM_RPM", "0"))
+LLM_TPM = int(os.getenv("LLM_TPM", "0"))
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "64"))
+DEFAULT_QUEUE_LIMITS = (200, 200, 1000, 5000)
+QUEUE_LIMITS = tuple(
+    int(os.getenv(f"LLM_QUEUE_LIMIT_{name.upper()}", default))
+    for name, default in zip(PRIORITY_NAMES, DEFAULT_QUEUE_LIMITS)
+)
+
+LLM_QUEUE_WAIT = Histogram(
+    "llm_queue_wait_seconds",
+    "Time LLM calls waited for a scheduler slot.",
+    ("priority",),
+)
+LLM_SHED = Counter(
+    "llm_requests_shed_total",
+    "LLM calls rejected by the scheduler (queue_full or wait_timeout).",
+    ("priority", "reason"),
+)
+
+# Lets a caller (e.g. an offline CLI) run its calls under another class
+_priority_override: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar(
+    "llm_priority_override", default=None
+)
+
+
+class SchedulerOverloadedError(LLMUnavailableError):
+    """The call was shed: its priority queue is full or it waited too long."""
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute, up to a one-minute burst."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def fits(self, amount: float, headroom: float) -> bool:
+        amount = min(amount, self.capacity)
+        return self.level - amount >= self.capacity * headroom or self.level >= self.capacity
+
+    def wait_time(self, amount: float, headroom: float) -> float:
+        amount = min(amount, self.capacity)
+        target = min(self.capacity, amount + self.capacity * headroom)
+        return max(0.0, (target - self.level) / self.rate)
+
+    def take(self, amount: float):
+        self.level -= min(amount, self.capacity)
+
+    def give(self, amount: float):
+        self.level = min(self.capacity, self.level + amount)
+
+
+class Ticket:
+    __slots__ = ("reserved", "used")
+
+    def __init__(self, reserved: int):
+        self.reserved = reserved
+        self.used: Optional[int] = None
+
+    def settle(self, used: int):
+        """Record the tokens the call actually consumed."""
+        self.used = used
+
+
+class LLMScheduler:
+    def __init__(
+        self,
+        rpm: int = LLM_RPM,
+        tpm: int = LLM_TPM,
+        max_in_flight: int = LLM_MAX_IN_FLIGHT,
+        queue_limits=QUEUE_LIMITS,
+    ):
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.max_in_flight = max_in_flight
+        self.queue_limits = tuple(queue_limits)
+        self.in_flight = 0
+        # per class: [future, tokens] entries in arrival order
+        self._queues: List[Deque[list]] = [deque() for _ in PRIORITY_NAMES]
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._stats = {name: {"admitted": 0, "shed": 0} for name in PRIORITY_NAMES}
+
+    # ---- capacity ----
+    def _fits(self, priority: int, tokens: int) -> bool:
+        headroom = HEADROOM[priority]
+        if self.max_in_flight and self.in_flight >= max(1, int(self.max_in_flight * (1 - headroom))):
+            return False
+        for bucket, amount in ((self.requests, 1), (self.tokens, tokens)):
+            if bucket is not None:
+                bucket.refill()
+                if not bucket.fits(amount, headroom):
+                    return False
+        return True
+
+    def _take(self, priority: int, tokens: int):
+        self.in_flight += 1
+        if self.requests is not None:
+            self.requests.take(1)
+        if self.tokens is not None:
+            self.tokens.take(tokens)
+        self._stats[PRIORITY_NAMES[priority]]["admitted"] += 1
+
+    def _release(self, ticket: Ticket):
+        self.in_flight -= 1
+        if self.tokens is not None and ticket.used is not None and ticket.used < ticket.reserved:
+            self.tokens.give(ticket.reserved - ticket.used)
+        self._dispatch()
+
+    # ---- queueing ----
+    def _dispatch(self):
+        """Grant queued calls strictly by priority while capacity allows."""
+        for priority, queue in enumerate(self._queues):
+            while queue:
+                future, tokens = queue[0]
+                if future.done():  # timed out or cancelled while queued
+                    queue.popleft()
+                    continue
+                if not self._fits(priority, tokens):
+                    self._schedule_wakeup(priority, tokens)
+                    return
+                queue.popleft()
+                self._take(priority, tokens)
+                future.set_result(None)
+
+    def _schedule_wakeup(self, priority: int, tokens: int):
+        # a release() re-dispatches; the timer only covers bucket refills
+        if self.max_in_flight and self.in_flight >= max(1, int(self.max_in_flight * (1 - HEADROOM[priority]))):
+            return
+        waits = [
+            bucket.wait_time(amount, HEADROOM[priority])
+            for bucket, amount in ((self.requests, 1), (self.tokens, tokens))
+            if bucket is not None
+        ]
+        delay = max(max(waits, default=0.0), 0.005)
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    async def acquire(self, priority: int, tokens: int, timeout: float):
+        name = PRIORITY_NAMES[priority]
+        ahead = any(self._queues[p] for p in range(priority + 1))
+        if not ahead and self._fits(priority, tokens):
+            self._take(priority, tokens)
+            return
+
+        queue = self._queues[priority]
+        if len(queue) >= self.queue_limits[priority]:
+            self._stats[name]["shed"] += 1
+            LLM_SHED.inc(name, "queue_full")
+            raise SchedulerOverloadedError(f"LLM {name} queue is full")
+
+        future = asyncio.get_running_loop().create_future()
+        entry = [future, tokens]
+        queue.append(entry)
+        self._dispatch()
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self._stats[name]["shed"] += 1
+            LLM_SHED.inc(name, "wait_timeout")
+            raise SchedulerOverloadedError(f"LLM {name} call waited over {timeout:.1f}s") from None
+        except asyncio.CancelledError:
+            # granted in the same loop step the caller was cancelled
+            if future.done() and not future.cancelled():
+                self._release(Ticket(0))
+            raise
+        finally:
+            if entry in queue:
+                queue.remove(entry)
+
+    @asynccontextmanager
+    async def slot(self, stage: str, tokens: int, deadline: Optional[float] = None):
+        """
+        Hold a scheduler slot for one LLM call (retries included). Waits at
+        most until `deadline` (time.monotonic()), by default the stage deadline.
+        """
+        priority = _priority_override.get()
+        if priority is None:
+            priority = STAGE_PRIORITY.get(stage, REPORT)
+        if deadline is None:
+            deadline = time.monotonic() + stage_deadline(stage)
+        start = time.perf_counter()
+        await self.acquire(priority, tokens, max(0.0, deadline - time.monotonic()))
+        LLM_QUEUE_WAIT.since(start, PRIORITY_NAMES[priority])
+
+        ticket = Ticket(tokens)
+        try:
+            yield ticket
+        finally:
+            self._release(ticket)
+
+    def snapshot(self) -> Dict[str, float]:
+        stats = {"in_flight": self.in_flight}
+        for name, queue in zip(PRIORITY_NAMES, self._queues):
+            stats[f"queued_{name}"] = len(queue)
+            stats[f"admitted_{name}"] = self._stats[name]["admitted"]
+            stats[f"shed_{name}"] = self._stats[name]["shed"]
+        if self.requests is not None:
+            self.requests.refill()
+            stats["rpm_available"] = round(self.requests.level, 1)
+        if self.tokens is not None:
+            self.tokens.refill()
+            stats["tpm_available"] = round(self.tokens.level, 1)
+        return stats
+
+
+@contextmanager
+def priority_class(priority: int):
+    """Run LLM calls made inside this block (and tasks it spawns) at `priority`."""
+    token = _priority_override.set(priority)
+    try:
+        yield
+    finally:
+        _priority_override.reset(token)
+
+
+scheduler = LLMScheduler()
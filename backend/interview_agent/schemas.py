@@ -0,0 +1,56 @@
+"""
+Response schemas for structured (JSON-mode) LLM output.
+
+The schemas use the OpenAPI subset accepted by Gemini's `response_schema`,
+and `evaluation_errors` checks a parsed response against the same shape
+locally, since the model can still truncate or drift from it.
+"""
+
+from typing import Any, Dict, List
+
+SCORE_KEYS = ("technical", "communication", "problem_solving", "structure")
+LIST_KEYS = ("strengths", "weaknesses", "suggestions")
+
+# Where an evaluation came from
+SOURCE_LLM = "llm"            # valid structured output on the first call
+SOURCE_REPAIRED = "repaired"  # fixed by the targeted repair call
+SOURCE_HEURISTIC = "heuristic"  # model output unusable; local estimate
+
+_EVALUATION_PROPERTIES: Dict[str, Any] = {
+    **{k: {"type": "number", "minimum": 0, "maximum": 10} for k in SCORE_KEYS},
+    **{k: {"type": "array", "items": {"type": "string"}} for k in LIST_KEYS},
+}
+
+EVALUATION_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": _EVALUATION_PROPERTIES,
+    "required": list(SCORE_KEYS + LIST_KEYS),
+}
+
+BATCH_EVALUATION_SCHEMA: Dict[str, Any] = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {"id": {"type": "integer"}, **_EVALUATION_PROPERTIES},
+        "required": ["id", *SCORE_KEYS, *LIST_KEYS],
+    },
+}
+
+
+def evaluation_errors(result: Any) -> List[str]:
+    """Schema violations of one evaluation object (empty list if valid)."""
+    if not isinstance(result, dict):
+        return [f"expected an object, got {type(result).__name__}"]
+
+    errors = []
+    for k in SCORE_KEYS:
+        value = result.get(k)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            errors.append(f"'{k}' must be a number")
+        elif not 0 <= value <= 10:
+            errors.append(f"'{k}' must be between 0 and 10")
+    for k in LIST_KEYS:
+        value = result.get(k)
+        if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+            errors.append(f"'{k}' must be a list of strings")
+    return errors
@@ -1,40 +1,253 @@
-from typing import Dict
+"""
+Local rubric-based scoring engine.
+
+Scores answers without an LLM, from:
+- concept coverage against the question's rubric (question_bank.jsonl);
+  questions without one get a rubric built from the question's own
+  content words
+- lexical features: length, sentence length, vocabulary variety, filler
+  words, reasoning and structure markers
+
+Text is tokenized once per answer; matching and scoring for a whole batch
+are NumPy matrix operations (answers x rubric terms -> answers x concepts),
+so thousands of answers score per second on one CPU core. Used per turn
+(`simple_scoring`), as the evaluation fallback when the LLM is unavailable
+(`evaluate`), and for batch rescoring (`score_batch`).
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from .question_bank import bank, RubricConcept
+
+WORD_RE = re.compile(r"[a-z0-9]+(?:[-'/][a-z0-9]+)*")
+SENTENCE_RE = re.compile(r"[.!?]+(?:\s|$)")
+
+# rubric words this long also match longer answer words ("lock" ~ "locking")
+PREFIX_MIN = 4
+
+STOPWORDS = frozenset(
+    "a an the and or of to in on for with is are was were be been it its this that these those "
+    "what which who how why when where do does did you your i me my we our they their them "
+    "explain describe tell about time between difference vs versus would could should can "
+    "give some any there here as at by from into than then so if".split()
+)
+FILLERS = frozenset("um uh like basically actually literally honestly stuff things whatever".split())
+REASONING = frozenset(
+    "because since therefore thus so hence means tradeoff trade-off however but although "
+    "whereas instead example instance e.g.".split()
+)
+CONNECTIVES = frozenset("first second third then next finally also additionally overall result".split())
+
+QuestionRef = Union[int, str, None]
+
+
+def _tokens(text: str) -> List[str]:
+    return WORD_RE.findall(text.lower())
+
+
+class _Rubric:
+    """Concepts of one question, each with tokenized terms and a weight."""
+
+    __slots__ = ("names", "terms", "weights")
+
+    def __init__(self, concepts: Sequence[RubricConcept]):
+        self.names = [c.concept for c in concepts]
+        self.terms = [[tuple(_tokens(t)) for t in c.terms if _tokens(t)] for c in concepts]
+        self.weights = [c.weight for c in concepts]
+
+
+@lru_cache(maxsize=4096)
+def _rubric_for(ref: QuestionRef) -> _Rubric:
+    """Rubric for a bank question id or question text (cached)."""
+    question = None
+    if isinstance(ref, int):
+        question = bank.get(ref)
+    elif ref:
+        question = bank.find(ref)
+    if question is not None and question.rubric:
+        return _Rubric(question.rubric)
+
+    # no rubric: each content word of the question is a concept
+    text = question.text if question is not None else (ref or "")
+    words = list(dict.fromkeys(w for w in _tokens(text) if w not in STOPWORDS and len(w) > 2))
+    return _Rubric([RubricConcept(w, (w,), 1.0) for w in words])
+
 
 class ScoreEngine:
     """
-    Simple deterministic scoring engine.
-    Later we will replace with full LLM-based scoring.
+    Deterministic local scoring engine (rubric coverage + lexical features).
     """
 
     def __init__(self):
         pass
 
-    def simple_scoring(self, answer: str) -> Dict[str, float]:
+    # ----------------------------------------------------------
+    # Feature extraction (one pass over each answer's tokens)
+    # ----------------------------------------------------------
+    @staticmethod
+    def _match(tokens: List[str], first: Dict[str, List[int]], prefixes: Dict[str, List[int]], phrases) -> set:
+        """Indexes of rubric terms that occur in `tokens`."""
+        hits = set()
+        n = len(tokens)
+        for i, tok in enumerate(tokens):
+            candidates = list(first.get(tok, ()))
+            for k in range(PREFIX_MIN, len(tok)):
+                candidates.extend(prefixes.get(tok[:k], ()))
+            for t in candidates:
+                if t in hits:
+                    continue
+                words = phrases[t]
+                if i + len(words) > n:
+                    continue
+                if all(_word_matches(tokens[i + j], w) for j, w in enumerate(words[1:], 1)):
+                    hits.add(t)
+        return hits
+
+    def score_batch(self, answers: Sequence[str], questions: Sequence[QuestionRef]) -> Dict[str, np.ndarray]:
         """
-        Basic scoring rules:
-        - depth score: based on length of response
-        - communication clarity: penalizes very long rambling answers
-        - technical score: same as depth for now
+        Score answers against their questions (bank ids or question texts).
+
+        Returns arrays (one entry per answer) for technical, communication,
+        problem_solving, structure and depth (0-10), plus coverage (0-1) and
+        the boolean concept-hit matrix with its rubric layout under "_hits".
         """
+        n = len(answers)
+        refs = list(questions)
+
+        # Rubrics involved, laid out as column blocks of one concept matrix
+        rubric_index: Dict[QuestionRef, int] = {}
+        rubrics: List[_Rubric] = []
+        for ref in refs:
+            if ref not in rubric_index:
+                rubric_index[ref] = len(rubrics)
+                rubrics.append(_rubric_for(ref))
+
+        phrases: List[Tuple[str, ...]] = []
+        term_concept: List[int] = []
+        concept_offsets = []
+        n_concepts = 0
+        for rubric in rubrics:
+            concept_offsets.append(n_concepts)
+            for c, terms in enumerate(rubric.terms):
+                for words in terms:
+                    phrases.append(words)
+                    term_concept.append(n_concepts + c)
+            n_concepts += len(rubric.names)
+
+        first: Dict[str, List[int]] = {}
+        prefixes: Dict[str, List[int]] = {}
+        for t, words in enumerate(phrases):
+            first.setdefault(words[0], []).append(t)
+            if len(words[0]) >= PREFIX_MIN:
+                prefixes.setdefault(words[0], []).append(t)
 
-        text = answer or ""
-        words = len(text.split())
+        # Per-answer lexical counts and term hits
+        feats = np.zeros((n, 6))  # words, unique, sentences, fillers, reasoning, connectives
+        hit_rows: List[int] = []
+        hit_cols: List[int] = []
+        for i, answer in enumerate(answers):
+            text = answer or ""
+            tokens = _tokens(text)
+            feats[i] = (
+                len(tokens),
+                len(set(tokens)),
+                max(1, len(SENTENCE_RE.findall(text.strip() + " "))) if tokens else 0,
+                sum(tok in FILLERS for tok in tokens),
+                sum(tok in REASONING for tok in tokens),
+                sum(tok in CONNECTIVES for tok in tokens),
+            )
+            if phrases and tokens:
+                hits = self._match(tokens, first, prefixes, phrases)
+                hit_rows.extend([i] * len(hits))
+                hit_cols.extend(hits)
 
-        # depth score (based on detail/length)
-        if words < 10:
-            depth = 3.0
-        elif words < 30:
-            depth = 6.0
-        else:
-            depth = 8.0
+        # answers x terms  @  terms x concepts  ->  answers x concepts
+        term_hits = np.zeros((n, len(phrases)), dtype=np.float32)
+        term_hits[hit_rows, hit_cols] = 1.0
+        term_to_concept = np.zeros((len(phrases), n_concepts), dtype=np.float32)
+        term_to_concept[np.arange(len(phrases)), term_concept] = 1.0
+        concept_hits = (term_hits @ term_to_concept) > 0
 
-        # communication clarity
-        # long answers slightly penalized
-        communication = 7.0 if words <= 120 else 6.0
+        # rubric x concepts weight matrix, one row selected per answer
+        weights = np.zeros((len(rubrics), n_concepts))
+        for r, (rubric, offset) in enumerate(zip(rubrics, concept_offsets)):
+            weights[r, offset:offset + len(rubric.weights)] = rubric.weights
+        answer_weights = weights[[rubric_index[ref] for ref in refs]] if n else weights[:0]
+        total = answer_weights.sum(axis=1)
+        coverage = np.where(total > 0, (concept_hits * answer_weights).sum(axis=1) / np.maximum(total, 1e-9), 0.0)
 
+        words, unique, sentences, fillers, reasoning, connectives = feats.T
+        safe_words = np.maximum(words, 1)
+        brevity = np.clip(words / 12, 0, 1)            # very short answers can't score high
+        length = np.clip(words / 60, 0, 1)             # detail saturates around 60 words
+        variety = np.clip(unique / safe_words / 0.6, 0, 1)
+        sentence_len = words / np.maximum(sentences, 1)
+        clarity = (
+            1.0
+            - 0.4 * np.clip(np.abs(sentence_len - 16) / 24, 0, 1)
+            - 0.3 * np.clip(fillers / safe_words * 10, 0, 1)
+            - 0.2 * (words > 150)
+        )
+        reasons = np.clip(reasoning / 3, 0, 1)
+        flow = 0.5 * np.clip((sentences - 1) / 3, 0, 1) + 0.5 * np.clip((connectives + reasoning) / 4, 0, 1)
+
+        scores = {
+            "technical": 1 + 9 * coverage * (0.6 + 0.4 * brevity),
+            "problem_solving": 1 + 9 * (0.65 * coverage + 0.35 * reasons) * (0.5 + 0.5 * brevity),
+            "depth": 1 + 9 * (0.55 * coverage + 0.3 * length + 0.15 * reasons) * brevity,
+            "communication": 1 + 9 * np.clip(clarity, 0, 1) * (0.4 + 0.4 * brevity + 0.2 * variety),
+            "structure": 1 + 9 * (0.3 + 0.7 * flow) * brevity,
+        }
+        result = {k: np.round(np.where(words > 0, v, 0.0), 1) for k, v in scores.items()}
+        result["coverage"] = coverage
+        result["_hits"] = (concept_hits, concept_offsets, rubrics, [rubric_index[ref] for ref in refs])
+        return result
+
+    # ----------------------------------------------------------
+    # Per-turn scores (depth / communication / technical)
+    # ----------------------------------------------------------
+    def simple_scoring(self, answer: str, question: QuestionRef = None) -> Dict[str, float]:
+        scores = self.score_batch([answer or ""], [question])
         return {
-            "depth": round(depth, 1),
-            "communication": round(communication, 1),
-            "technical": round(depth, 1),
+            "depth": float(scores["depth"][0]),
+            "communication": float(scores["communication"][0]),
+            "technical": float(scores["technical"][0]),
         }
 
+    # ----------------------------------------------------------
+    # Evaluation-shaped results (LLM fallback, batch rescoring)
+    # ----------------------------------------------------------
+    def evaluate(self, answers: Sequence[str], questions: Sequence[QuestionRef]) -> List[Dict[str, object]]:
+        """Scores plus strengths/weaknesses/suggestions from covered and missed concepts."""
+        scores = self.score_batch(answers, questions)
+        concept_hits, offsets, rubrics, rows = scores["_hits"]
+
+        results = []
+        for i, r in enumerate(rows):
+            rubric, offset = rubrics[r], offsets[r]
+            hit = concept_hits[i, offset:offset + len(rubric.names)]
+            order = np.argsort(-np.asarray(rubric.weights, dtype=np.float32), kind="stable")
+            covered = [rubric.names[c] for c in order if hit[c]]
+            missed = [rubric.names[c] for c in order if not hit[c]]
+            results.append({
+                "technical": float(scores["technical"][i]),
+                "communication": float(scores["communication"][i]),
+                "problem_solving": float(scores["problem_solving"][i]),
+                "structure": float(scores["structure"][i]),
+                "strengths": [f"Covers {name}" for name in covered[:2]],
+                "weaknesses": [f"Does not address {name}" for name in missed[:2]],
+                "suggestions": [f"Explain {name}" for name in missed[:2]],
+            })
+        return results
+
+
+def _word_matches(token: str, word: str) -> bool:
+    return token == word or (len(word) >= PREFIX_MIN and token.startswith(word))
+
+
+# Shared instance for module-level callers (evaluation fallback, scripts)
+engine = ScoreEngine()
@@ -0,0 +1,163 @@
+"""
+Compact in-memory session representation.
+
+A SessionRecord keeps questions as integer ids into a process-wide
+QuestionTable (seeded with the question bank), metadata as interned ids,
+and derives `last_question` instead of storing a second copy. SessionView
+exposes a record through the same read-only mapping shape callers used
+with the old nested-dict sessions.
+"""
+
+import sys
+import json
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Any, List, Optional
+
+from .prompts import QUESTION_TEMPLATES
+
+
+class QuestionTable:
+    """Interns question texts and metadata dicts to small integer ids."""
+
+    def __init__(self):
+        self.texts: List[str] = []
+        self._text_ids: Dict[str, int] = {}
+        self.metadata: List[Dict[str, Any]] = []
+        self._metadata_ids: Dict[Any, int] = {}
+
+    def question_id(self, text: str) -> int:
+        qid = self._text_ids.get(text)
+        if qid is None:
+            qid = len(self.texts)
+            self.texts.append(sys.intern(text))
+            self._text_ids[text] = qid
+        return qid
+
+    def metadata_id(self, metadata: Dict[str, Any]) -> int:
+        try:
+            key = tuple(sorted(metadata.items()))
+            hash(key)
+        except TypeError:
+            # nested/unhashable values
+            key = json.dumps(metadata, sort_keys=True)
+        mid = self._metadata_ids.get(key)
+        if mid is None:
+            mid = len(self.metadata)
+            self.metadata.append(dict(metadata))
+            self._metadata_ids[key] = mid
+        return mid
+
+
+questions = QuestionTable()
+for _templates in QUESTION_TEMPLATES.values():
+    for _q in _templates:
+        questions.question_id(_q)
+
+
+class SessionRecord:
+    __slots__ = (
+        "role",
+        "created_at",
+        "last_access",
+        "turn_count",
+        "confusion_count",
+        "off_topic_count",
+        "question_ids",
+        "metadata_ids",
+        "last_question_id",
+        "answers",
+        "evaluations",
+        "metadata",
+    )
+
+    def __init__(self, role: str, now: float):
+        self.role = sys.intern(role)
+        self.created_at = now
+        self.last_access = now
+        self.turn_count = 0
+        self.confusion_count = 0
+        self.off_topic_count = 0
+        self.question_ids = array("i")
+        self.metadata_ids = array("i")
+        # -1: derive from the last asked question
+        self.last_question_id = -1
+        self.answers: List[str] = []
+        # created on first use; most sessions never need them
+        self.evaluations: Optional[Dict[int, dict]] = None
+        self.metadata: Optional[Dict[str, Any]] = None
+
+    def append_question(self, question: str, metadata: dict):
+        self.question_ids.append(questions.question_id(question))
+        self.metadata_ids.append(questions.metadata_id(metadata))
+        self.last_question_id = -1
+
+    def set_last_question(self, question: str):
+        self.last_question_id = questions.question_id(question)
+
+    @property
+    def last_question(self) -> Optional[str]:
+        if self.last_question_id >= 0:
+            return questions.texts[self.last_question_id]
+        if self.question_ids:
+            return questions.texts[self.question_ids[-1]]
+        return None
+
+    def set_evaluation(self, index: int, entry: dict):
+        if self.evaluations is None:
+            self.evaluations = {}
+        self.evaluations[index] = entry
+
+    def set_metadata(self, key: str, value: Any):
+        if self.metadata is None:
+            self.metadata = {}
+        self.metadata[key] = value
+
+
+class SessionView(Mapping):
+    """Read-only dict-compatible view of a SessionRecord."""
+
+    __slots__ = ("_record",)
+
+    KEYS = (
+        "role",
+        "questions_asked",
+        "answers",
+        "created_at",
+        "last_access",
+        "turn_count",
+        "confusion_count",
+        "off_topic_count",
+        "last_question",
+        "evaluations",
+        "metadata",
+    )
+
+    def __init__(self, record: SessionRecord):
+        self._record = record
+
+    def __getitem__(self, key: str):
+        r = self._record
+        if key == "questions_asked":
+            return [
+                {"q": questions.texts[qid], "metadata": dict(questions.metadata[mid])}
+                for qid, mid in zip(r.question_ids, r.metadata_ids)
+            ]
+        if key == "last_question":
+            return r.last_question
+        if key == "evaluations":
+            return r.evaluations or {}
+        if key == "metadata":
+            return r.metadata or {}
+        if key in self.KEYS:
+            return getattr(r, key)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+    def __repr__(self) -> str:
+        return f"SessionView({dict(self)!r})"
@@ -0,0 +1,56 @@
+"""
+Single-flight coalescing of duplicate in-flight requests.
+
+While a computation for a key is running, further calls with the same key
+await that computation instead of starting their own. With `linger`, a
+successful result is also kept for a few seconds after it completes, so
+retries that arrive just after the original finished (e.g. webhook
+redeliveries) get the same answer instead of re-running side effects.
+
+Waiters are shielded: a caller that disconnects does not cancel the shared
+computation for the others.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class SingleFlight:
+    def __init__(self, linger: float = 0.0):
+        self.linger = linger
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self._stats = {"leader": 0, "shared": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]], linger: Optional[float] = None) -> Any:
+        """
+        Run `fn()` for `key`, or join the run already in flight (or lingering).
+        `linger` overrides the instance setting for this run.
+        """
+        if linger is None:
+            linger = self.linger
+        future = self._calls.get(key)
+        if future is not None:
+            self._stats["shared"] += 1
+            return await asyncio.shield(future)
+
+        self._stats["leader"] += 1
+        future = self._calls[key] = asyncio.ensure_future(fn())
+        future.add_done_callback(lambda f: self._done(key, f, linger))
+        return await asyncio.shield(future)
+
+    def _done(self, key: Hashable, future: asyncio.Future, linger: float):
+        # failures are never reused; successes linger if configured
+        if future.cancelled() or future.exception() is not None or linger <= 0:
+            self._forget(key, future)
+        else:
+            asyncio.get_running_loop().call_later(linger, self._forget, key, future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future):
+        if self._calls.get(key) is future:
+            del self._calls[key]
+
+    def snapshot(self) -> Dict[str, int]:
+        return {**self._stats, "active": len(self._calls)}
+
+    def __len__(self) -> int:
+        return len(self._calls)
@@ -0,0 +1,478 @@
+"""
+Session storage backends used by SessionMemory.
+
+- InMemorySessionStore: a per-process dict of compact records (default, fastest)
+- SQLiteSessionStore: a local SQLite file in WAL mode, so several uvicorn
+  workers (or a reloaded server) see the same live sessions
+
+Questions and answers are append-only rows and counters are updated
+atomically in SQL, so concurrent writers never overwrite each other. The
+writes of one step of a turn (recording an answer, picking the next
+question) run in a single BEGIN IMMEDIATE transaction, so workers handling
+the same session at once still get distinct answer indexes and questions.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Optional, Tuple
+
+from .session_record import SessionRecord, SessionView, questions
+
+COUNTER_FIELDS = ("turn_count", "confusion_count", "off_topic_count")
+
+# (role, metadata value) -> (new metadata value, (question, question metadata) or None)
+QuestionPicker = Callable[[str, Any], Tuple[Any, Optional[Tuple[str, dict]]]]
+
+
+def _json_default(value: Any):
+    # byte strings in metadata (e.g. the question-bank bitmap) are stored as hex
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def new_session(role: str, now: float) -> Dict[str, Any]:
+    return {
+        "role": role,
+        "questions_asked": [],
+        "answers": [],
+        "created_at": now,
+        "last_access": now,
+        "turn_count": 0,
+        "confusion_count": 0,
+        "off_topic_count": 0,
+        "last_question": None,
+        "evaluations": {},
+        "metadata": {}
+    }
+
+
+class SessionStore(ABC):
+    """Storage interface behind SessionMemory."""
+
+    # True when calls do blocking I/O; SessionMemory then runs them off the event loop
+    blocking = False
+
+    @abstractmethod
+    def create(self, session_id: str, role: str, now: float): ...
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def last_access(self, session_id: str) -> Optional[float]:
+        """Last access time, or None if the session does not exist."""
+
+    @abstractmethod
+    def get_evaluation(self, session_id: str, index: int) -> Optional[dict]:
+        """The stored evaluation entry for one question index, if any."""
+
+    @abstractmethod
+    def touch(self, session_id: str, now: float): ...
+
+    @abstractmethod
+    def increment(self, session_id: str, field: str): ...
+
+    @abstractmethod
+    def set_last_question(self, session_id: str, question: str): ...
+
+    @abstractmethod
+    def append_question(self, session_id: str, question: str, metadata: dict): ...
+
+    @abstractmethod
+    def append_answer(self, session_id: str, answer: str): ...
+
+    @abstractmethod
+    def record_answer(self, session_id: str, answer: str) -> Optional[Dict[str, Any]]:
+        """
+        Atomically append an answer and count the turn. Returns the answer's
+        index, the question it answers (None if none was asked at that
+        index), the last question and the role; None if the session is gone.
+        """
+
+    @abstractmethod
+    def advance_question(self, session_id: str, key: str, pick: QuestionPicker) -> Optional[Tuple[str, dict]]:
+        """
+        Atomically run `pick` on metadata[key], store the new value and
+        append the picked question. Returns the pick; KeyError if no session.
+        """
+
+    @abstractmethod
+    def set_evaluation(self, session_id: str, index: int, entry: dict):
+        """Store an evaluation entry; a no-op if the session is gone."""
+
+    @abstractmethod
+    def set_metadata(self, session_id: str, key: str, value: Any): ...
+
+    @abstractmethod
+    def delete(self, session_id: str) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def delete_idle(self, cutoff: float) -> int:
+        """Delete sessions last accessed before `cutoff`; returns the count."""
+
+    @abstractmethod
+    def evict_lru(self, max_sessions: int) -> int:
+        """Delete least recently used sessions beyond `max_sessions`."""
+
+    @abstractmethod
+    def count(self) -> int: ...
+
+
+class InMemorySessionStore(SessionStore):
+    """Per-process store of compact SessionRecords, returned as SessionViews."""
+
+    def __init__(self):
+        # ordered from least to most recently accessed
+        self.sessions: "OrderedDict[str, SessionRecord]" = OrderedDict()
+
+    def create(self, session_id: str, role: str, now: float):
+        self.sessions[session_id] = SessionRecord(role, now)
+        self.sessions.move_to_end(session_id)
+
+    def get(self, session_id: str):
+        record = self.sessions.get(session_id)
+        return SessionView(record) if record is not None else None
+
+    def last_access(self, session_id: str):
+        record = self.sessions.get(session_id)
+        return record.last_access if record is not None else None
+
+    def get_evaluation(self, session_id: str, index: int):
+        record = self.sessions.get(session_id)
+        if record is None or record.evaluations is None:
+            return None
+        return record.evaluations.get(index)
+
+    def touch(self, session_id: str, now: float):
+        self.sessions[session_id].last_access = now
+        self.sessions.move_to_end(session_id)
+
+    def increment(self, session_id: str, field: str):
+        if field not in COUNTER_FIELDS:
+            raise ValueError(f"Unknown counter: {field}")
+        record = self.sessions[session_id]
+        setattr(record, field, getattr(record, field) + 1)
+
+    def set_last_question(self, session_id: str, question: str):
+        self.sessions[session_id].set_last_question(question)
+
+    def append_question(self, session_id: str, question: str, metadata: dict):
+        self.sessions[session_id].append_question(question, metadata)
+
+    def append_answer(self, session_id: str, answer: str):
+        self.sessions[session_id].answers.append(answer)
+
+    def record_answer(self, session_id: str, answer: str):
+        record = self.sessions.get(session_id)
+        if record is None:
+            return None
+        index = len(record.answers)
+        record.answers.append(answer)
+        record.turn_count += 1
+        question = questions.texts[record.question_ids[index]] if index < len(record.question_ids) else None
+        return {"index": index, "question": question, "last_question": record.last_question, "role": record.role}
+
+    def advance_question(self, session_id: str, key: str, pick: QuestionPicker):
+        record = self.sessions[session_id]
+        value, picked = pick(record.role, (record.metadata or {}).get(key))
+        record.set_metadata(key, value)
+        if picked is not None:
+            record.append_question(*picked)
+        return picked
+
+    def set_evaluation(self, session_id: str, index: int, entry: dict):
+        record = self.sessions.get(session_id)
+        if record is not None:
+            record.set_evaluation(index, entry)
+
+    def set_metadata(self, session_id: str, key: str, value: Any):
+        self.sessions[session_id].set_metadata(key, value)
+
+    def delete(self, session_id: str):
+        record = self.sessions.pop(session_id, None)
+        return SessionView(record) if record is not None else None
+
+    def delete_idle(self, cutoff: float) -> int:
+        removed = 0
+        # LRU order means idle sessions are all at the front
+        while self.sessions:
+            session_id, record = next(iter(self.sessions.items()))
+            if record.last_access >= cutoff:
+                break
+            del self.sessions[session_id]
+            removed += 1
+        return removed
+
+    def evict_lru(self, max_sessions: int) -> int:
+        removed = 0
+        while len(self.sessions) > max_sessions:
+            self.sessions.popitem(last=False)
+            removed += 1
+        return removed
+
+    def count(self) -> int:
+        return len(self.sessions)
+
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite (WAL) store shared by every process that opens the same file."""
+
+    blocking = True
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sessions (
+        session_id TEXT PRIMARY KEY,
+        role TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        last_access REAL NOT NULL,
+        turn_count INTEGER NOT NULL DEFAULT 0,
+        confusion_count INTEGER NOT NULL DEFAULT 0,
+        off_topic_count INTEGER NOT NULL DEFAULT 0,
+        last_question TEXT,
+        metadata TEXT NOT NULL DEFAULT '{}'
+    );
+    CREATE INDEX IF NOT EXISTS idx_sessions_last_access ON sessions (last_access);
+    CREATE TABLE IF NOT EXISTS questions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id TEXT NOT NULL REFERENCES sessions (session_id) ON DELETE CASCADE,
+        q TEXT NOT NULL,
+        metadata TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_questions_session ON questions (session_id, id);
+    CREATE TABLE IF NOT EXISTS answers (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id TEXT NOT NULL REFERENCES sessions (session_id) ON DELETE CASCADE,
+        answer TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_answers_session ON answers (session_id, id);
+    CREATE TABLE IF NOT EXISTS evaluations (
+        session_id TEXT NOT NULL REFERENCES sessions (session_id) ON DELETE CASCADE,
+        idx INTEGER NOT NULL,
+        entry TEXT NOT NULL,
+        PRIMARY KEY (session_id, idx)
+    );
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=5.0, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(self.SCHEMA)
+
+    def _write(self, sql: str, params=()) -> int:
+        with self._lock:
+            return self._db.execute(sql, params).rowcount
+
+    def create(self, session_id: str, role: str, now: float):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+                self._db.execute(
+                    "INSERT INTO sessions (session_id, role, created_at, last_access) VALUES (?, ?, ?, ?)",
+                    (session_id, role, now, now),
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def get(self, session_id: str):
+        with self._lock:
+            # one read transaction = consistent snapshot across the tables
+            self._db.execute("BEGIN")
+            try:
+                return self._read(session_id)
+            finally:
+                self._db.execute("COMMIT")
+
+    def _read(self, session_id: str):
+        row = self._db.execute(
+            "SELECT role, created_at, last_access, turn_count, confusion_count, "
+            "off_topic_count, last_question, metadata FROM sessions WHERE session_id = ?",
+            (session_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        questions = self._db.execute(
+            "SELECT q, metadata FROM questions WHERE session_id = ? ORDER BY id", (session_id,)
+        ).fetchall()
+        answers = self._db.execute(
+            "SELECT answer FROM answers WHERE session_id = ? ORDER BY id", (session_id,)
+        ).fetchall()
+        evaluations = self._db.execute(
+            "SELECT idx, entry FROM evaluations WHERE session_id = ?", (session_id,)
+        ).fetchall()
+
+        session = new_session(row[0], row[1])
+        session.update({
+            "last_access": row[2],
+            "turn_count": row[3],
+            "confusion_count": row[4],
+            "off_topic_count": row[5],
+            "last_question": row[6],
+            "metadata": json.loads(row[7]),
+            "questions_asked": [{"q": q, "metadata": json.loads(m)} for q, m in questions],
+            "answers": [a for (a,) in answers],
+            "evaluations": {idx: json.loads(e) for idx, e in evaluations},
+        })
+        return session
+
+    def last_access(self, session_id: str):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT last_access FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_evaluation(self, session_id: str, index: int):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT entry FROM evaluations WHERE session_id = ? AND idx = ?", (session_id, index)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def touch(self, session_id: str, now: float):
+        self._write("UPDATE sessions SET last_access = ? WHERE session_id = ?", (now, session_id))
+
+    def increment(self, session_id: str, field: str):
+        if field not in COUNTER_FIELDS:
+            raise ValueError(f"Unknown counter: {field}")
+        self._write(f"UPDATE sessions SET {field} = {field} + 1 WHERE session_id = ?", (session_id,))
+
+    def set_last_question(self, session_id: str, question: str):
+        self._write("UPDATE sessions SET last_question = ? WHERE session_id = ?", (question, session_id))
+
+    def append_question(self, session_id: str, question: str, metadata: dict):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "INSERT INTO questions (session_id, q, metadata) VALUES (?, ?, ?)",
+                    (session_id, question, json.dumps(metadata)),
+                )
+                self._db.execute(
+                    "UPDATE sessions SET last_question = ? WHERE session_id = ?", (question, session_id)
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def append_answer(self, session_id: str, answer: str):
+        self._write("INSERT INTO answers (session_id, answer) VALUES (?, ?)", (session_id, answer))
+
+    def record_answer(self, session_id: str, answer: str):
+        with self._lock:
+            # the write lock orders turns across processes, so the index
+            # read back is the one this answer was stored at
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT role, last_question FROM sessions WHERE session_id = ?", (session_id,)
+                ).fetchone()
+                if row is None:
+                    self._db.execute("ROLLBACK")
+                    return None
+                self._db.execute("INSERT INTO answers (session_id, answer) VALUES (?, ?)", (session_id, answer))
+                self._db.execute(
+                    "UPDATE sessions SET turn_count = turn_count + 1 WHERE session_id = ?", (session_id,)
+                )
+                index = self._db.execute(
+                    "SELECT COUNT(*) - 1 FROM answers WHERE session_id = ?", (session_id,)
+                ).fetchone()[0]
+                question = self._db.execute(
+                    "SELECT q FROM questions WHERE session_id = ? ORDER BY id LIMIT 1 OFFSET ?",
+                    (session_id, index),
+                ).fetchone()
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return {
+            "index": index,
+            "question": question[0] if question else None,
+            "last_question": row[1],
+            "role": row[0],
+        }
+
+    def advance_question(self, session_id: str, key: str, pick: QuestionPicker):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT role, json_extract(metadata, '$.' || ?) FROM sessions WHERE session_id = ?",
+                    (key, session_id),
+                ).fetchone()
+                if row is None:
+                    raise KeyError(session_id)
+                value, picked = pick(row[0], json.loads(row[1]) if row[1] is not None else None)
+                self._db.execute(
+                    "UPDATE sessions SET metadata = json_set(metadata, '$.' || ?, json(?)) WHERE session_id = ?",
+                    (key, json.dumps(value, default=_json_default), session_id),
+                )
+                if picked is not None:
+                    question, metadata = picked
+                    self._db.execute(
+                        "INSERT INTO questions (session_id, q, metadata) VALUES (?, ?, ?)",
+                        (session_id, question, json.dumps(metadata)),
+                    )
+                    self._db.execute(
+                        "UPDATE sessions SET last_question = ? WHERE session_id = ?", (question, session_id)
+                    )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return picked
+
+    def set_evaluation(self, session_id: str, index: int, entry: dict):
+        self._write(
+            "INSERT OR REPLACE INTO evaluations (session_id, idx, entry) "
+            "SELECT ?, ?, ? WHERE EXISTS (SELECT 1 FROM sessions WHERE session_id = ?)",
+            (session_id, index, json.dumps(entry), session_id),
+        )
+
+    def set_metadata(self, session_id: str, key: str, value: Any):
+        self._write(
+            "UPDATE sessions SET metadata = json_set(metadata, '$.' || ?, json(?)) WHERE session_id = ?",
+            (key, json.dumps(value, default=_json_default), session_id),
+        )
+
+    def delete(self, session_id: str):
+        session = self.get(session_id)
+        if session is not None:
+            self._write("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        return session
+
+    def delete_idle(self, cutoff: float) -> int:
+        return self._write("DELETE FROM sessions WHERE last_access < ?", (cutoff,))
+
+    def evict_lru(self, max_sessions: int) -> int:
+        return self._write(
+            "DELETE FROM sessions WHERE session_id IN ("
+            "SELECT session_id FROM sessions ORDER BY last_access "
+            "LIMIT MAX(0, (SELECT COUNT(*) FROM sessions) - ?))",
+            (max_sessions,),
+        )
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+
+def store_from_env() -> SessionStore:
+    """Pick the backend from SESSION_STORE (memory | sqlite) and SESSION_DB_PATH."""
+    backend = os.getenv("SESSION_STORE", "memory")
+    if backend == "sqlite":
+        return SQLiteSessionStore(os.getenv("SESSION_DB_PATH", "sessions.db"))
+    if backend == "memory":
+        return InMemorySessionStore()
+    raise ValueError(f"Unknown SESSION_STORE: {backend}")
@@ -0,0 +1,140 @@
+"""
+Offline end-to-end load test.
+
+Drives full multi-turn interviews against the FastAPI app: text sessions
+through /chat and voice sessions through /vapi-webhook, each finishing with
+/report. Unless --url is given, the app runs in-process with the fake LLM
+provider (LLM_PROVIDER=fake), so no Gemini key is needed.
+
+Reports p50/p95/p99 latency and requests/sec per endpoint, plus overall
+turns/sec.
+
+Run: python loadtest.py --sessions 200 --turns 4 --concurrency 100
+"""
+
+import os
+import time
+import random
+import asyncio
+import argparse
+import statistics
+from collections import defaultdict
+
+ANSWERS = [
+    "A process has its own address space while threads share the memory of their process.",
+    "When two threads read and write shared state without synchronization the outcome depends on timing.",
+    "It hashes the key into a bucket index and resolves collisions with chaining or open addressing.",
+    "Merge sort runs in O(n log n) because it halves the input and merges each level in linear time.",
+    "I don't know",
+    "yes",
+    "Honestly I was watching football yesterday, did you see the game last night? It was great.",
+]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[k]
+
+
+class LoadTest:
+    def __init__(self, client, turns: int, voice_ratio: float, seed: int):
+        self.client = client
+        self.turns = turns
+        self.voice_ratio = voice_ratio
+        self.rng = random.Random(seed)
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.completed_turns = 0
+
+    async def _post(self, path: str, payload: dict) -> dict:
+        start = time.perf_counter()
+        try:
+            res = await self.client.post(path, json=payload)
+            res.raise_for_status()
+            return res.json()
+        except Exception:
+            self.errors[path] += 1
+            raise
+        finally:
+            self.latencies[path].append(time.perf_counter() - start)
+
+    async def text_interview(self):
+        data = await self._post("/chat", {"message": "hi", "session_id": None})
+        sid = data["session_id"]
+        for _ in range(self.turns):
+            await self._post("/chat", {"message": self.rng.choice(ANSWERS), "session_id": sid})
+            self.completed_turns += 1
+        await self._post("/report", {"session_id": sid})
+
+    async def voice_interview(self):
+        data = await self._post("/vapi-webhook", {})
+        sid = data["conversation_id"]
+        for _ in range(self.turns):
+            await self._post("/vapi-webhook", {"conversation_id": sid, "transcript": self.rng.choice(ANSWERS)})
+            self.completed_turns += 1
+        await self._post("/report", {"session_id": sid})
+
+    async def run(self, sessions: int, concurrency: int):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _one(i: int):
+            async with semaphore:
+                try:
+                    if self.rng.random() < self.voice_ratio:
+                        await self.voice_interview()
+                    else:
+                        await self.text_interview()
+                except Exception:
+                    pass  # counted in self.errors
+
+        start = time.perf_counter()
+        await asyncio.gather(*(_one(i) for i in range(sessions)))
+        return time.perf_counter() - start
+
+    def print_report(self, elapsed: float):
+        print(f"\n{'endpoint':<15} {'count':>6} {'errors':>6} {'p50_ms':>8} {'p95_ms':>8} {'p99_ms':>8} {'req/s':>8}")
+        for path, values in sorted(self.latencies.items()):
+            print(
+                f"{path:<15} {len(values):>6} {self.errors[path]:>6} "
+                f"{percentile(values, 50) * 1000:>8.1f} {percentile(values, 95) * 1000:>8.1f} "
+                f"{percentile(values, 99) * 1000:>8.1f} {len(values) / elapsed:>8.1f}"
+            )
+        all_values = [v for values in self.latencies.values() for v in values]
+        print(f"\n⏱️  {elapsed:.2f}s total, {self.completed_turns} turns → "
+              f"{self.completed_turns / elapsed:.1f} turns/sec, "
+              f"mean request {statistics.mean(all_values) * 1000 if all_values else 0:.1f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--voice-ratio", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--url", help="target a running server instead of the in-process app")
+    args = parser.parse_args()
+
+    import httpx
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+    else:
+        os.environ.setdefault("LLM_PROVIDER", "fake")
+        os.environ.setdefault("LLM_CACHE_ENABLED", "0")
+        from main import app
+
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=60)
+
+    async with client:
+        test = LoadTest(client, args.turns, args.voice_ratio, args.seed)
+        print(f"🚀 {args.sessions} interviews x {args.turns} turns, concurrency {args.concurrency}")
+        elapsed = await test.run(args.sessions, args.concurrency)
+        test.print_report(elapsed)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,21 +1,61 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, PlainTextResponse
 import uvicorn
+import os
+import asyncio
+import hashlib
+import json
+import time
 import uuid
+import logging
+from contextlib import asynccontextmanager
 
-from interview_agent.agent import InterviewAgent
+from interview_agent.agent import InterviewAgent, iter_message_tokens
 from interview_agent.memory import SessionMemory
-from interview_agent.advanced_scoring import aggregate_report
+from interview_agent.store import store_from_env
+from interview_agent import metrics, classifier, llm, resilience, scheduler
+from interview_agent import advanced_scoring
+from interview_agent.advanced_scoring import summarize_evaluations
+from interview_agent.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
 
 # -------------------------------------------
 # APP INITIALIZATION
 # -------------------------------------------
-app = FastAPI()
-
-# Global Interview Agent
-memory = SessionMemory()
+# Global Interview Agent (SESSION_STORE=sqlite shares sessions across workers)
+memory = SessionMemory(store=store_from_env())
 agent = InterviewAgent(memory=memory)
 
+# Duplicate in-flight requests share one computation: repeated "View Report"
+# clicks per session, and Vapi webhook retries per turn. Webhook results
+# linger (when the turn has an id) so a retry arriving after the original
+# finished is not re-applied.
+report_flights = SingleFlight(linger=float(os.getenv("REPORT_SINGLEFLIGHT_LINGER_SECONDS", "2")))
+webhook_flights = SingleFlight(linger=float(os.getenv("WEBHOOK_SINGLEFLIGHT_LINGER_SECONDS", "30")))
+
+# Near-duplicate index: evaluations kept across restarts
+NEAR_DUP_PATH = os.getenv("NEAR_DUP_PATH")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # expire idle interviews in the background
+    sweeper = asyncio.create_task(memory.run_sweeper())
+
+    index = advanced_scoring.near_duplicates
+    if index is not None and NEAR_DUP_PATH:
+        loaded = index.load(NEAR_DUP_PATH)
+        logger.info("loaded %d stored evaluations from %s", loaded, NEAR_DUP_PATH)
+    try:
+        yield
+    finally:
+        sweeper.cancel()
+        if index is not None and NEAR_DUP_PATH:
+            index.save(NEAR_DUP_PATH)
+
+app = FastAPI(lifespan=lifespan)
+
 # -------------------------------------------
 # CORS (Allow all for now, restrict later)
 # -------------------------------------------
@@ -38,13 +78,50 @@ async def chat_endpoint(request: Request):
     # If no session provided → start new interview
     if not session_id:
         session_id = str(uuid.uuid4())[:8]
-        start = agent.start_interview(session_id, role="software_engineer")
+        start = await agent.start_interview(session_id, role="software_engineer")
         return {"session_id": session_id, "response": start}
 
     # Otherwise, handle answer
-    response = agent.handle_answer(session_id, user_msg)
+    response = await agent.handle_answer(session_id, user_msg)
     return {"session_id": session_id, "response": response}
 
+# -------------------------------------------
+# STREAMING CHAT ENDPOINT (Server-Sent Events)
+# -------------------------------------------
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: Request):
+    """
+    Same contract as /chat, streamed: `token` events carry reply text as it
+    is produced, and a final `done` event carries session_id + response.
+    """
+    data = await request.json()
+    user_msg = data.get("message")
+    session_id = data.get("session_id")
+
+    async def events():
+        if not session_id:
+            new_id = str(uuid.uuid4())[:8]
+            start = await agent.start_interview(new_id, role="software_engineer")
+            for token in iter_message_tokens(start["message"]):
+                yield _sse("token", {"text": token})
+            yield _sse("done", {"session_id": new_id, "response": start})
+            return
+
+        async for kind, payload in agent.stream_answer(session_id, user_msg):
+            if kind == "token":
+                yield _sse("token", {"text": payload})
+            else:
+                yield _sse("done", {"session_id": session_id, "response": payload})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 # -------------------------------------------
 # VAPI WEBHOOK (VOICE MODE)
 # -------------------------------------------
@@ -58,14 +135,23 @@ async def vapi_webhook(request: Request):
     if not session_id:
         # Start new session
         session_id = str(uuid.uuid4())[:8]
-        start = agent.start_interview(session_id, role="software_engineer")
+        start = await agent.start_interview(session_id, role="software_engineer")
         return {
             "response": start["message"],
             "conversation_id": session_id
         }
 
-    # Handle voice message
-    result = agent.handle_answer(session_id, user_msg)
+    # Handle voice message (retries of the same turn join the first delivery).
+    # Without a turn id, identical transcripts are only coalesced while the
+    # first is in flight: the same words said again later are a new answer.
+    turn_id = body.get("turn_id") or body.get("message_id") or body.get("timestamp")
+    linger = None
+    if not turn_id:
+        turn_id = hashlib.sha256((user_msg or "").encode("utf-8")).hexdigest()
+        linger = 0
+    result = await webhook_flights.do(
+        (session_id, turn_id), lambda: agent.handle_answer(session_id, user_msg), linger=linger
+    )
 
     return {
         "response": result["message"],
@@ -75,6 +161,18 @@ async def vapi_webhook(request: Request):
 # -------------------------------------------
 # REPORT ENDPOINT (Advanced Scoring)
 # -------------------------------------------
+def _qa_pairs(session_data) -> list:
+    """Build QA pairs in order."""
+    qa_pairs = []
+    answers = session_data["answers"]
+    for i, q in enumerate(session_data["questions_asked"]):
+        answer = answers[i] if i < len(answers) else ""
+        qa_pairs.append({
+            "question": q["q"],
+            "answer": answer
+        })
+    return qa_pairs
+
 @app.post("/report")
 async def generate_report(request: Request):
     data = await request.json()
@@ -83,24 +181,127 @@ async def generate_report(request: Request):
     if not session_id:
         return {"error": "session_id is required"}
 
-    session_data = memory.get(session_id)
+    session_data = await memory.get(session_id)
     if not session_data:
         return {"error": "No session found with this ID"}
 
-    # Build QA pairs in order
-    qa_pairs = []
-    for i, q in enumerate(session_data["questions_asked"]):
-        answer = session_data["answers"][i] if i < len(session_data["answers"]) else ""
-        qa_pairs.append({
-            "question": q["q"],
-            "answer": answer
-        })
+    qa_pairs = _qa_pairs(session_data)
+
+    async def build_report():
+        # Per-question evaluations were started in the background as answers
+        # arrived; only await leftovers and score what is missing or changed
+        started = time.perf_counter()
+        results = await agent.background.collect(session_id, session_data["role"], qa_pairs)
+        report = summarize_evaluations(qa_pairs, results)
+        metrics.STAGE_SECONDS.since(started, "report")
+        return report
 
-    # Generate full report
-    report = aggregate_report(session_data["role"], qa_pairs)
+    # keyed by answer count so a report requested after a new answer is fresh
+    report = await report_flights.do((session_id, len(session_data["answers"])), build_report)
 
     return {"session_id": session_id, "report": report}
 
+# -------------------------------------------
+# STREAMING REPORT ENDPOINT (NDJSON)
+# -------------------------------------------
+@app.post("/report/stream")
+async def generate_report_stream(request: Request):
+    """
+    One JSON object per line:
+    {"event": "start", "total": n}
+    {"event": "evaluation", "index": i, ...}   (in completion order)
+    {"event": "final_summary", "report": {...}}
+    or, if scoring fails part way, a last {"event": "error", "error": "..."}
+    """
+    data = await request.json()
+    session_id = data.get("session_id")
+
+    if not session_id:
+        return {"error": "session_id is required"}
+
+    session_data = await memory.get(session_id)
+    if not session_data:
+        return {"error": "No session found with this ID"}
+
+    role = session_data["role"]
+    qa_pairs = _qa_pairs(session_data)
+
+    async def records():
+        yield json.dumps({"event": "start", "session_id": session_id, "total": len(qa_pairs)}) + "\n"
+
+        results = [None] * len(qa_pairs)
+        try:
+            async for index, result in agent.background.stream(session_id, role, qa_pairs):
+                results[index] = result
+                yield json.dumps({
+                    "event": "evaluation",
+                    "index": index,
+                    "question": qa_pairs[index]["question"],
+                    "answer": qa_pairs[index]["answer"],
+                    "evaluation": result
+                }) + "\n"
+
+            report = summarize_evaluations(qa_pairs, results)
+        except Exception:
+            # the 200 status is already sent: report the failure in-stream
+            logger.exception("report stream failed for session %s", session_id)
+            yield json.dumps({"event": "error", "session_id": session_id, "error": "Report generation failed"}) + "\n"
+            return
+        yield json.dumps({"event": "final_summary", "session_id": session_id, "report": report}) + "\n"
+
+    return StreamingResponse(records(), media_type="application/x-ndjson")
+
+# -------------------------------------------
+# METRICS (Prometheus text format)
+# -------------------------------------------
+metrics.CallbackMetric(
+    "sessions", "Session lifecycle counts (active, created, ended, evicted_lru, expired_ttl).",
+    memory.snapshot, labelname="state",
+)
+metrics.CallbackMetric(
+    "classifier_fast_path", "Local behavior classifier results (total, fast_path, escalated).",
+    lambda: {k: v for k, v in classifier.stats.snapshot().items() if k in ("total", "fast_path", "escalated")},
+    labelname="result",
+)
+metrics.CallbackMetric(
+    "llm_cache", "LLM response cache stats.",
+    lambda: llm.cache.snapshot() if llm.cache else {},
+    labelname="stat",
+)
+metrics.CallbackMetric(
+    "llm_tokens_total", "LLM requests and tokens (reported or estimated).",
+    llm.usage_stats, type="counter", labelname="kind",
+)
+metrics.CallbackMetric(
+    "background_evaluations_in_flight", "Per-answer evaluations still running.",
+    lambda: len(agent.background._tasks),
+)
+metrics.CallbackMetric(
+    "llm_circuit_breaker", "LLM circuit breaker state and trip counts.",
+    resilience.breaker.snapshot, labelname="stat",
+)
+metrics.CallbackMetric(
+    "llm_scheduler", "LLM scheduler queue depth, admissions, shed calls and bucket levels.",
+    scheduler.scheduler.snapshot, labelname="stat",
+)
+metrics.CallbackMetric(
+    "report_singleflight", "/report calls that computed (leader) or joined (shared) a report; active keys.",
+    report_flights.snapshot, labelname="kind",
+)
+metrics.CallbackMetric(
+    "webhook_singleflight", "/vapi-webhook turns that ran (leader) or were coalesced (shared); active keys.",
+    webhook_flights.snapshot, labelname="kind",
+)
+metrics.CallbackMetric(
+    "near_duplicate_index", "Evaluations reused for near-duplicate answers (saved_calls), lookups and index size.",
+    lambda: advanced_scoring.near_duplicates.snapshot() if advanced_scoring.near_duplicates else {},
+    labelname="stat",
+)
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 # -------------------------------------------
 # ROOT
 # -------------------------------------------
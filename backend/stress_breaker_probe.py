@@ -0,0 +1,88 @@
+"""
+Stress test: cancelling the circuit breaker's half-open probe.
+
+Puts the breaker in half-open state and cancels the probe call at each
+point it can be waiting (mid-attempt, during retry backoff, in a stream
+before and after the first chunk), then checks that the probe was handed
+back so the next call may probe again. A probe stuck in use would
+short-circuit every LLM call for the life of the process.
+
+Run: python stress_breaker_probe.py
+"""
+
+import os
+import asyncio
+
+os.environ.setdefault("LLM_PROVIDER", "fake")
+os.environ.setdefault("LLM_CACHE_ENABLED", "0")
+os.environ.setdefault("FAKE_LLM_LATENCY", "fixed:0.3")
+
+from interview_agent import llm, resilience  # noqa: E402
+
+
+class ServiceUnavailable(Exception):
+    status_code = 503
+
+
+def half_open() -> resilience.CircuitBreaker:
+    breaker = resilience.breaker
+    breaker.state = "open"
+    breaker.opened_at = -1e9  # reset timeout long passed
+    breaker._probing = False
+    return breaker
+
+
+async def cancel_after(coro, delay: float):
+    task = asyncio.create_task(coro)
+    await asyncio.sleep(delay)
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, llm.LLMUnavailableError):
+        pass
+
+
+async def slow_upstream():
+    await asyncio.sleep(5)
+
+
+async def failing_upstream():
+    raise ServiceUnavailable("503")
+
+
+async def stream(prompt: str, chunks: int):
+    received = 0
+    chunks_iter = llm.stream_llm(prompt, stage="followup", use_cache=False)
+    try:
+        async for _ in chunks_iter:
+            received += 1
+            if received >= chunks:
+                break
+    finally:
+        await chunks_iter.aclose()
+
+
+async def main():
+    resilience.LLM_RETRY_BASE_SECONDS = resilience.LLM_RETRY_MAX_SECONDS = 1.0
+    cases = {
+        "cancelled mid-attempt": cancel_after(resilience.guarded_call("evaluate", slow_upstream), 0.05),
+        "cancelled during backoff": cancel_after(resilience.guarded_call("evaluate", failing_upstream), 0.05),
+        "stream cancelled before first chunk": cancel_after(stream("probe one", 99), 0.05),
+        "stream closed after first chunk": stream("probe two three four", 1),
+    }
+
+    failed = 0
+    for name, case in cases.items():
+        breaker = half_open()
+        await case
+        ok = not breaker._probing and breaker.allow()
+        failed += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {name:<38} state {breaker.state}")
+        breaker.record_success()
+
+    print("✅ PASS" if not failed else f"❌ FAIL ({failed} cases left the probe held)")
+    return failed
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))
@@ -0,0 +1,126 @@
+"""
+Stress test: concurrent turns on the same sessions.
+
+Fires several simultaneous handle_answer calls per session (double-clicks,
+webhook retries) across many sessions, with a fake LLM of random latency,
+then checks that:
+- no two turns of one session were ever in flight together
+- every answer was recorded, in order, with consistent turn counters
+- every background evaluation is aligned with its question/answer index
+- different sessions still ran in parallel
+
+With workers > 1, each worker is a separate agent (own locks, own SQLite
+connection) on one shared database and a session's turns are spread over
+them, as with several uvicorn workers and no sticky routing. Turns may then
+overlap and land in any order, but every answer must still be recorded
+once and every evaluation must match its own question/answer index.
+
+Run: python stress_session_locks.py [sessions] [turns_per_session] [workers]
+"""
+
+import os
+import sys
+import json
+import tempfile
+import time
+import random
+import asyncio
+from collections import defaultdict
+
+from interview_agent import agent as agent_module
+from interview_agent import advanced_scoring
+from interview_agent.agent import InterviewAgent
+from interview_agent.memory import SessionMemory
+from interview_agent.store import SQLiteSessionStore
+
+N_SESSIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+TURNS = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+WORKERS = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+LATENCY = (0.005, 0.03)
+
+in_flight = defaultdict(int)
+overlaps = 0
+
+
+def _session_tag(prompt: str) -> str:
+    start = prompt.index("<<") + 2
+    return prompt[start:prompt.index(">>", start)]
+
+
+async def fake_classifier(prompt: str) -> str:
+    global overlaps
+    sid = _session_tag(prompt)
+    in_flight[sid] += 1
+    if in_flight[sid] > 1:
+        overlaps += 1
+    await asyncio.sleep(random.uniform(*LATENCY))
+    in_flight[sid] -= 1
+    return random.choice(["NORMAL", "NORMAL", "OFF_TOPIC", "CHATTY"])
+
+
+async def fake_evaluator(prompt: str, max_output_tokens: int = 800) -> str:
+    await asyncio.sleep(random.uniform(*LATENCY))
+    return json.dumps({
+        "technical": 7, "communication": 7, "problem_solving": 7, "structure": 7,
+        "strengths": [], "weaknesses": [], "suggestions": []
+    })
+
+
+async def main():
+    agent_module._call_llm = fake_classifier
+    advanced_scoring._call_llm = fake_evaluator
+
+    if WORKERS > 1:
+        db_path = os.path.join(tempfile.mkdtemp(), "sessions.db")
+        agents = [InterviewAgent(memory=SessionMemory(SQLiteSessionStore(db_path))) for _ in range(WORKERS)]
+    else:
+        agents = [InterviewAgent(memory=SessionMemory())]
+    agent = agents[0]
+    sids = [f"s{i}" for i in range(N_SESSIONS)]
+    for sid in sids:
+        await agent.start_interview(sid, "software_engineer")
+        for _ in range(TURNS - 1):
+            await agent.ask_next_question(sid)
+
+    def answer(sid: str, turn: int) -> str:
+        return f"<<{sid}>> turn {turn} answer about threads processes and shared memory"
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        agents[t % WORKERS].handle_answer(sid, answer(sid, t)) for sid in sids for t in range(TURNS)
+    ))
+    elapsed = time.perf_counter() - start
+
+    # let background evaluations settle
+    while any(a.background._tasks for a in agents):
+        await asyncio.sleep(0.01)
+
+    misaligned = 0
+    for sid in sids:
+        s = await agent.memory.get(sid)
+        questions = [q["q"] for q in s["questions_asked"]]
+        expected = [answer(sid, t) for t in range(TURNS)]
+        recorded = s["answers"] if WORKERS == 1 else sorted(s["answers"], key=expected.index)
+        if recorded != expected or s["turn_count"] != TURNS:
+            misaligned += 1
+            continue
+        for i, entry in s["evaluations"].items():
+            if entry["question"] != questions[i] or entry["answer"] != s["answers"][i]:
+                misaligned += 1
+                break
+
+    serial_estimate = N_SESSIONS * TURNS * sum(LATENCY) / 2
+    print(f"📊 {N_SESSIONS} sessions x {TURNS} concurrent turns on {WORKERS} worker(s) in {elapsed:.2f}s "
+          f"(fully serial would be ~{serial_estimate:.1f}s)")
+    print(f"overlapping turns within a session: {overlaps}")
+    print(f"sessions with misaligned QA pairs:  {misaligned}")
+    leftover = sum(len(a.locks) for a in agents)
+    print(f"leftover session locks:             {leftover}")
+    # with several workers, turns of one session may overlap by design
+    ok = (overlaps == 0 or WORKERS > 1) and misaligned == 0 and leftover == 0
+    print("✅ PASS" if ok else "❌ FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,9 +1,71 @@
-import { useState } from "react";
-import axios from "axios";
+import { useRef, useState } from "react";
 import ChatUI from "./components/ChatUI";
 import ReportView from "./components/ReportView";
 import RoleSelect from "./components/RoleSelect";
 
+// POST a JSON body and call onEvent(event, data) for each Server-Sent Event
+async function postSSE(url, payload, onEvent) {
+  const res = await fetch(url, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(payload),
+  });
+  if (!res.ok || !res.body) throw new Error(`HTTP ${res.status}`);
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // events are separated by a blank line
+    let sep;
+    while ((sep = buffer.indexOf("\n\n")) !== -1) {
+      const raw = buffer.slice(0, sep);
+      buffer = buffer.slice(sep + 2);
+
+      let event = "message";
+      let data = "";
+      for (const line of raw.split("\n")) {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) data += line.slice(5).trim();
+      }
+      if (data) onEvent(event, JSON.parse(data));
+    }
+  }
+}
+
+// POST a JSON body and call onRecord(obj) for each newline-delimited JSON record
+async function postNDJSON(url, payload, onRecord) {
+  const res = await fetch(url, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(payload),
+  });
+  if (!res.ok || !res.body) throw new Error(`HTTP ${res.status}`);
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let nl;
+    while ((nl = buffer.indexOf("\n")) !== -1) {
+      const line = buffer.slice(0, nl).trim();
+      buffer = buffer.slice(nl + 1);
+      if (line) onRecord(JSON.parse(line));
+    }
+  }
+  if (buffer.trim()) onRecord(JSON.parse(buffer));
+}
+
 export default function App() {
   const [messages, setMessages] = useState([]);
   const [sessionId, setSessionId] = useState(null);
@@ -11,9 +73,11 @@ export default function App() {
   const [showReport, setShowReport] = useState(false);
   const [role, setRole] = useState(null);
   const [isTyping, setIsTyping] = useState(false);
+  // ignore repeated "View Report" clicks while a report is streaming
+  const reportInFlight = useRef(false);
 
-  const API_CHAT = "http://127.0.0.1:8000/chat";
-  const API_REPORT = "http://127.0.0.1:8000/report";
+  const API_CHAT_STREAM = "http://127.0.0.1:8000/chat/stream";
+  const API_REPORT_STREAM = "http://127.0.0.1:8000/report/stream";
 
   const startInterviewWithRole = (selectedRole) => {
     setRole(selectedRole);
@@ -34,26 +98,35 @@ export default function App() {
         role: role,
       };
 
-      const res = await axios.post(API_CHAT, payload);
-      const data = res.data;
-
-      if (!sessionId) {
-        setSessionId(data.session_id);
-      }
-
-      // Simulate natural typing delay
-      setTimeout(() => {
-        setMessages((prev) => [
-          ...prev,
-          { sender: "ai", text: data.response.message },
-        ]);
-        setIsTyping(false);
-      }, 800);
+      // Reply bubble fills in as token events arrive; "done" finalizes it
+      await postSSE(API_CHAT_STREAM, payload, (event, data) => {
+        if (event === "token") {
+          setMessages((prev) => {
+            const last = prev[prev.length - 1];
+            if (last?.streaming) {
+              return [...prev.slice(0, -1), { ...last, text: last.text + data.text }];
+            }
+            return [...prev, { sender: "ai", text: data.text, streaming: true }];
+          });
+        } else if (event === "done") {
+          if (data.response.metadata?.error === "session_not_found") {
+            // expired or evicted: the next message starts a new interview
+            setSessionId(null);
+          } else if (!sessionId) {
+            setSessionId(data.session_id);
+          }
+          setMessages((prev) => [
+            ...prev.filter((m) => !m.streaming),
+            { sender: "ai", text: data.response.message },
+          ]);
+          setIsTyping(false);
+        }
+      });
 
     } catch (err) {
       console.error(err);
       setMessages((prev) => [
-        ...prev,
+        ...prev.filter((m) => !m.streaming),
         { sender: "ai", text: "⚠️ Error connecting to server" },
       ]);
       setIsTyping(false);
@@ -62,14 +135,38 @@ export default function App() {
 
   const viewReport = async () => {
     if (!sessionId) return alert("Interview not started!");
+    if (reportInFlight.current) return;
+    reportInFlight.current = true;
 
+    // Show the report right away and fill it in as evaluations stream back
+    let finished = false;
     try {
-      const res = await axios.post(API_REPORT, { session_id: sessionId });
-      setReport(res.data.report);
-      setShowReport(true);
+      await postNDJSON(API_REPORT_STREAM, { session_id: sessionId }, (record) => {
+        if (record.event === "error" || record.error) {
+          throw new Error(record.error);
+        } else if (record.event === "start") {
+          setReport({ total: record.total, per_question: [], final_summary: null });
+          setShowReport(true);
+        } else if (record.event === "evaluation") {
+          setReport((prev) => {
+            const per_question = [...prev.per_question];
+            per_question[record.index] = record;
+            return { ...prev, per_question };
+          });
+        } else if (record.event === "final_summary") {
+          finished = true;
+          setReport((prev) => ({ ...prev, ...record.report }));
+        }
+      });
+      // a dropped connection ends the stream without a summary
+      if (!finished) throw new Error("Report stream ended before the final summary");
     } catch (err) {
       console.error(err);
+      // don't leave a half-filled report spinning on "Scoring answers…"
+      setShowReport(false);
       alert("Error generating report");
+    } finally {
+      reportInFlight.current = false;
     }
   };
 
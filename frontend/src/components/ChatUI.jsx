@@ -33,11 +33,12 @@ export default function ChatUI({ onSend }) {
             }`}
           >
             {msg.text}
+            {msg.streaming && <span className="animate-pulse">▍</span>}
           </div>
         ))}
 
-        {/* Typing indicator */}
-        {onSend.isTyping && (
+        {/* Typing indicator (until the first streamed token arrives) */}
+        {onSend.isTyping && !onSend.messages.at(-1)?.streaming && (
           <div className="bg-gray-700 w-20 px-4 py-3 rounded-lg flex space-x-2">
             <span className="typing-dot"></span>
             <span className="typing-dot"></span>
@@ -2,7 +2,8 @@ export default function ReportView({ report, onBack }) {
   if (!report) return null;
 
   const final = report.final_summary;
-  const scores = report.scores;
+  const scored = report.per_question.filter(Boolean);
+  const estimated = final?.evaluation_sources?.heuristic || 0;
 
   return (
     <div className="p-6 bg-gray-900 text-white min-h-screen">
@@ -15,52 +16,95 @@ export default function ReportView({ report, onBack }) {
 
       <h1 className="text-3xl font-bold mb-4">Final Interview Report</h1>
 
-      {/* Overall Score */}
-      <div className="bg-gray-800 p-4 rounded-lg mb-6">
-        <h2 className="text-xl font-semibold mb-2">Overall Score</h2>
-        <p className="text-4xl font-bold">{final.overall_score.toFixed(2)} / 10</p>
-      </div>
+      {/* Progress while evaluations stream in */}
+      {!final && (
+        <div className="bg-gray-800 p-4 rounded-lg mb-6 animate-pulse">
+          Scoring answers… {scored.length} / {report.total}
+        </div>
+      )}
 
-      {/* Scores */}
-      <div className="grid grid-cols-2 gap-4 mb-6">
-        {Object.entries(final.averages).map(([key, val]) => (
-          <div key={key} className="bg-gray-800 p-4 rounded-lg">
-            <p className="text-lg font-semibold capitalize">{key}</p>
-            <p className="text-2xl font-bold">{val.toFixed(1)}</p>
+      {final && (
+        <>
+          {/* Overall Score */}
+          <div className="bg-gray-800 p-4 rounded-lg mb-6">
+            <h2 className="text-xl font-semibold mb-2">Overall Score</h2>
+            <p className="text-4xl font-bold">{final.overall_score.toFixed(2)} / 10</p>
           </div>
-        ))}
-      </div>
 
-      {/* Strengths */}
-      <div className="bg-gray-800 p-4 rounded-lg mb-6">
-        <h2 className="text-xl font-semibold mb-2">Top Strengths</h2>
-        <ul className="list-disc ml-6">
-          {final.top_strengths.map((s, i) => (
-            <li key={i}>{s}</li>
-          ))}
-        </ul>
-      </div>
+          {/* Answers the model could not evaluate */}
+          {estimated > 0 && (
+            <div className="bg-yellow-900 text-yellow-100 p-4 rounded-lg mb-6">
+              {estimated} answer{estimated > 1 ? "s" : ""} could not be evaluated by the model;
+              {estimated > 1 ? " they were" : " it was"} scored locally against the question rubric.
+            </div>
+          )}
 
-      {/* Weaknesses */}
-      <div className="bg-gray-800 p-4 rounded-lg mb-6">
-        <h2 className="text-xl font-semibold mb-2">Weaknesses</h2>
-        <ul className="list-disc ml-6">
-          {final.top_weaknesses.map((s, i) => (
-            <li key={i}>{s}</li>
-          ))}
-        </ul>
-      </div>
+          {/* Scores */}
+          <div className="grid grid-cols-2 gap-4 mb-6">
+            {Object.entries(final.averages).map(([key, val]) => (
+              <div key={key} className="bg-gray-800 p-4 rounded-lg">
+                <p className="text-lg font-semibold capitalize">{key}</p>
+                <p className="text-2xl font-bold">{val.toFixed(1)}</p>
+              </div>
+            ))}
+          </div>
+
+          {/* Strengths */}
+          <div className="bg-gray-800 p-4 rounded-lg mb-6">
+            <h2 className="text-xl font-semibold mb-2">Top Strengths</h2>
+            <ul className="list-disc ml-6">
+              {final.top_strengths.map((s, i) => (
+                <li key={i}>{s}</li>
+              ))}
+            </ul>
+          </div>
+
+          {/* Weaknesses */}
+          <div className="bg-gray-800 p-4 rounded-lg mb-6">
+            <h2 className="text-xl font-semibold mb-2">Weaknesses</h2>
+            <ul className="list-disc ml-6">
+              {final.top_weaknesses.map((s, i) => (
+                <li key={i}>{s}</li>
+              ))}
+            </ul>
+          </div>
 
-      {/* Suggestions */}
-      <div className="bg-gray-800 p-4 rounded-lg">
-        <h2 className="text-xl font-semibold mb-2">Suggestions</h2>
-        <ul className="list-disc ml-6">
-          {final.top_suggestions.map((s, i) => (
-            <li key={i}>{s}</li>
-          ))}
-        </ul>
+          {/* Suggestions */}
+          <div className="bg-gray-800 p-4 rounded-lg mb-6">
+            <h2 className="text-xl font-semibold mb-2">Suggestions</h2>
+            <ul className="list-disc ml-6">
+              {final.top_suggestions.map((s, i) => (
+                <li key={i}>{s}</li>
+              ))}
+            </ul>
+          </div>
+        </>
+      )}
+
+      {/* Per-question breakdown (fills in as each answer is scored) */}
+      <div className="space-y-4">
+        {report.per_question.map((item, i) =>
+          item ? (
+            <div key={i} className="bg-gray-800 p-4 rounded-lg">
+              <p className="font-semibold mb-1">
+                Q{i + 1}. {item.question}
+                {item.evaluation.source === "heuristic" && (
+                  <span className="ml-2 text-xs text-yellow-300">(estimated)</span>
+                )}
+              </p>
+              <p className="text-gray-300 mb-3">{item.answer || "—"}</p>
+              <div className="grid grid-cols-4 gap-2 text-sm">
+                {["technical", "communication", "problem_solving", "structure"].map((key) => (
+                  <div key={key} className="bg-gray-700 p-2 rounded">
+                    <p className="capitalize">{key.replace("_", " ")}</p>
+                    <p className="text-lg font-bold">{Number(item.evaluation[key]).toFixed(1)}</p>
+                  </div>
+                ))}
+              </div>
+            </div>
+          ) : null
+        )}
       </div>
     </div>
   );
 }
-